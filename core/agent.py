@@ -2,15 +2,21 @@
 Main AI Agent implementation
 """
 
+import hashlib
 import json
+import re
 import requests
 import os
-from typing import List, Dict, Optional
+import time
+from collections import OrderedDict, deque
+from operator import attrgetter
+from typing import Callable, List, Dict, Optional, Iterator
 from core.config import AgentConfig, get_system_prompt, list_system_prompts
 from core.prompt_manager import PromptManager
-from core.functions import execute_function, get_file_language
+from core.functions import build_function_dispatch, execute_function, get_file_language
 from utils.display import (
     rich_print,
+    print_styled_lines,
     typewriter_print,
     print_syntax_highlighted,
     print_file_table,
@@ -22,32 +28,89 @@ from utils.display import (
     print_model_params_table,
 )
 from utils.terminal import setup_readline_history, save_readline_history, test_ollama_connection
-from utils.filesystem import safe_change_directory, get_directory_info, suggest_safe_directories, format_directory_safety_info
+from utils.filesystem import safe_change_directory, get_directory_info, suggest_safe_directories, existing_directories, format_directory_safety_info
 
+# Fast JSON parsing with fallback
+try:
+    import orjson
 
-class OllamaAgent:
-    """Main AI Agent class"""
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
 
-    def __init__(self, config: AgentConfig):
-        self.config = config
-        self.prompt_manager = PromptManager()
-        # Ensure prompts directory exists and export built-ins
-        self.prompt_manager.ensure_prompts_directory()
-        self.reset_conversation()
+# Decoder for API responses; both accept bytes or str
+_json_loads = orjson.loads if ORJSON_AVAILABLE else json.loads
 
-    def reset_conversation(self) -> None:
-        """Reset conversation with current system prompt"""
-        base_prompt, is_from_file = self.prompt_manager.load_prompt(self.config.current_prompt)
 
-        if not base_prompt:
-            rich_print(f"⚠️  Prompt '{self.config.current_prompt}' not found, using default", style="yellow")
-            base_prompt, _ = self.prompt_manager.load_prompt("default")
+def _json_dumps(obj) -> bytes:
+    """Encode a request body fragment as UTF-8 JSON bytes"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj)
+    return json.dumps(obj).encode("utf-8")
 
-        # Dynamically append shell command instructions if enabled
-        if self.config.shell_commands_enabled:
-            shell_instructions = """
 
-SHELL COMMANDS ENABLED:
+# Request headers for pre-encoded JSON bodies
+_JSON_HEADERS = {"Content-Type": "application/json"}
+
+# Substring every function call reply must contain
+_FUNCTION_CALL_MARKER = '"function_call"'
+
+# Maximum number of model replies kept in the response cache
+_RESPONSE_CACHE_SIZE = 128
+
+# Seconds a fetched model list is reused by /listmodels
+_MODELS_CACHE_TTL = 30.0
+
+# Number of saved sessions listed by a bare /resume
+_RESUME_LIST_SIZE = 10
+
+# Characters shown by /cat before truncating
+_CAT_MAX_CHARS = 1500
+
+# Bytes of a binary file shown by /cat as a hex dump
+_CAT_HEX_BYTES = 256
+
+# Keywords that indicate user wants to see content, matched at word starts in one pass
+_SHOW_KEYWORDS = (
+    "show",
+    "display",
+    "view",
+    "see",
+    "content",
+    "contents",
+    "read",
+    "what is",
+    "what's",
+    "tell me about",
+    "examine",
+    "look at",
+    "open",
+    "check",
+    "inspect",
+)
+_SHOW_RE = re.compile(
+    r"\b(?:" + "|".join(re.escape(k) for k in _SHOW_KEYWORDS) + ")", re.IGNORECASE
+)
+
+# Prefix of the user message that carries a function result back to the model
+_FUNCTION_RESULT_PREFIX = "Function result: "
+
+# Number of trimmed user requests remembered in the history summary
+_SUMMARY_MAX_TOPICS = 10
+
+# Language inside the parenthesised part of a file content header
+_LANG_RE = re.compile(r"\(([^,)]+)")
+
+# Function results that are always shown to the user
+_ALWAYS_SHOW = frozenset({"get_files_info", "write_file", "run_python_file"})
+
+# File reads, shown when the prompt asks to see content
+_READ_FUNCTIONS = frozenset({"get_file_content", "batch_read"})
+
+# Shell command instructions, sent as a separate system message after the base
+# prompt so toggling /shellcmds never rewrites the cached system prefix.
+# Ollama merges consecutive system messages, so the model sees one system prompt.
+_SHELL_INSTRUCTIONS = """SHELL COMMANDS ENABLED:
 You now have access to safe shell commands via the shell_command function. Use these for common file operations:
 
 - Create directories: shell_command with {"command": "mkdir", "args": ["dirname"]}
@@ -65,50 +128,375 @@ Examples of natural usage:
 These shell commands are safer and more intuitive than writing Python scripts for basic file operations.
 Use shell commands as your first choice for file/directory operations, then use write_file for adding content.
 """
-            system_content = base_prompt + shell_instructions
-        else:
-            system_content = base_prompt
 
-        self.messages = [{"role": "system", "content": system_content}]
 
-    def call_ollama_api(self, messages: List[Dict]) -> Dict:
-        """Call Ollama's REST API"""
-        url = f"{self.config.api_base}/api/chat"
+class OllamaAgent:
+    """Main AI Agent class"""
+
+    def __init__(self, config: AgentConfig):
+        self.config = config
+        # One pooled session so every API call reuses the same keep-alive connection
+        self._session = requests.Session()
+        self.prompt_manager = PromptManager()
+        # Ensure prompts directory exists and export built-ins
+        self.prompt_manager.ensure_prompts_directory()
+        self._shell_msg = {"role": "system", "content": _SHELL_INSTRUCTIONS}
+        # LRU of reply content keyed by a hash of (model, messages, options)
+        self._response_cache: "OrderedDict[bytes, str]" = OrderedDict()
+        self._slash_commands = self._build_slash_commands()
+        self._function_dispatch = build_function_dispatch(self.config)
+        # Only /cd changes directory, so the cwd is refreshed there instead of per prompt
+        self._cwd = os.getcwd()
+        # Model options and endpoint URLs, rebuilt only when the config changes
+        self._options: Dict = {}
+        self._options_key = None
+        self._urls_base = None
+        self._chat_url = ""
+        self._tags_url = ""
+        # Encoded request pieces: the fixed payload head and each message's bytes
+        self._payload_prefix_key = None
+        self._payload_prefix = b""
+        self._encoded_messages: Dict[int, tuple] = {}
+        # (fetch time, api base, model names) from the last /api/tags call
+        self._models_cache: Optional[tuple] = None
+        # Session log file, opened on the first message of each conversation
+        self._log_id = ""
+        self._log_file = None
+        self.reset_conversation()
 
+    def reset_conversation(self) -> None:
+        """Reset conversation with current system prompt"""
+        base_prompt, is_from_file = self.prompt_manager.load_prompt(self.config.current_prompt)
+
+        if not base_prompt:
+            rich_print(f"⚠️  Prompt '{self.config.current_prompt}' not found, using default", style="yellow")
+            base_prompt, _ = self.prompt_manager.load_prompt("default")
+
+        self._system_msg = {"role": "system", "content": base_prompt}
+        self.messages = [self._system_msg]
+        self._start_session_log()
+
+        # Summary of turns dropped by the history window
+        self._summary_msg = None
+        self._trimmed_count = 0
+        self._trimmed_topics = deque(maxlen=_SUMMARY_MAX_TOPICS)
+        self._trimmed_calls = {}
+        # Real user prompts currently in self.messages
+        self._user_turns = 0
+        # id(assistant message) -> function it called ("" for plain answers), noted
+        # when the reply is parsed so trimming never parses it again
+        self._call_names: Dict[int, str] = {}
+
+        # Dynamically add shell command instructions if enabled
+        if self.config.shell_commands_enabled:
+            self.messages.append(self._shell_msg)
+
+    def _start_session_log(self) -> None:
+        """Close the current session log and pick a fresh session id"""
+        if self._log_file is not None:
+            self._log_file.close()
+            self._log_file = None
+        base_id = time.strftime("%Y%m%d-%H%M%S")
+        log_id, suffix = base_id, 1
+        # Several /clear calls can land in the same second
+        while log_id == self._log_id or os.path.exists(self._session_log_path(log_id)):
+            suffix += 1
+            log_id = f"{base_id}-{suffix}"
+        self._log_id = log_id
+
+    def _session_log_path(self, session_id: str) -> str:
+        """Path of a session's JSONL log"""
+        return os.path.join(os.path.expanduser(self.config.session_log_dir), f"{session_id}.jsonl")
+
+    def append_message(self, message: Dict) -> None:
+        """Add a message to the conversation and the session log"""
+        self.messages.append(message)
+        if self._is_user_turn(message):
+            self._user_turns += 1
+        if not self.config.session_log_enabled:
+            return
+
+        try:
+            if self._log_file is None:
+                log_path = self._session_log_path(self._log_id)
+                os.makedirs(os.path.dirname(log_path), mode=0o700, exist_ok=True)
+                # Private to the user; unbuffered, so every message is on disk even if the process dies
+                fd = os.open(log_path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o600)
+                self._log_file = open(fd, "ab", buffering=0)
+            self._log_file.write(_json_dumps(message) + b"\n")
+        except OSError as e:
+            rich_print(f"⚠️  Session log disabled: {e}", style="yellow")
+            self.config.session_log_enabled = False
+
+    def list_sessions(self) -> List[str]:
+        """Saved session ids, newest first"""
+        try:
+            with os.scandir(os.path.expanduser(self.config.session_log_dir)) as entries:
+                names = [e.name[:-6] for e in entries if e.name.endswith(".jsonl")]
+        except OSError:
+            return []
+        return sorted(names, reverse=True)
+
+    def resume_session(self, session_id: str) -> int:
+        """Replace the conversation with a saved session. Returns messages loaded"""
+        # Ids are bare file names; anything else could reach outside the history dir
+        if (
+            not session_id
+            or os.path.basename(session_id) != session_id
+            or ".." in session_id
+            or (os.altsep and os.altsep in session_id)
+        ):
+            raise ValueError(f"invalid session id: {session_id!r}")
+        loaded = []
+        with open(self._session_log_path(session_id), "rb") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    message = _json_loads(line)
+                except ValueError:
+                    continue  # Torn last line from a crash
+                if isinstance(message, dict) and "role" in message and "content" in message:
+                    loaded.append(message)
+
+        self.reset_conversation()
+        # Keep appending to the resumed session's file
+        self._log_id = session_id
+        self.messages.extend(loaded)
+        self._user_turns = sum(1 for m in loaded if self._is_user_turn(m))
+        self._trim_history()
+        return len(loaded)
+
+    def warm_up(self) -> bool:
+        """Have the server prefill the current history so the next reply starts fast"""
+        self._refresh_api_urls()
         payload = {
             "model": self.config.model,
-            "messages": messages,
+            "messages": self.messages,
             "stream": False,
-            "options": self.config.get_model_options(),
+            "options": {**self._get_model_options(), "num_predict": 1},
         }
+        try:
+            response = self._session.post(
+                self._chat_url, data=_json_dumps(payload), headers=_JSON_HEADERS
+            )
+            return response.status_code == 200
+        except requests.RequestException:
+            return False
+
+    def set_shell_instructions(self, enabled: bool) -> None:
+        """Add or remove shell command instructions without clearing the history.
+
+        The instructions sit right after the system prompt, so toggling them
+        changes every later position and the server recomputes the whole
+        prompt once on the next request.
+        """
+        present = len(self.messages) > 1 and self.messages[1] is self._shell_msg
+        if enabled and not present:
+            self.messages.insert(1, self._shell_msg)
+        elif not enabled and present:
+            del self.messages[1]
+
+    @staticmethod
+    def _is_user_turn(message: Dict) -> bool:
+        """Check if message is a real user prompt rather than a function result"""
+        return message["role"] == "user" and not message["content"].startswith(
+            _FUNCTION_RESULT_PREFIX
+        )
+
+    def _trim_history(self) -> None:
+        """Keep the system messages and the last `history_window` user turns.
+
+        Older turns are folded into a short summary message so every request
+        sends O(window) tokens instead of the whole conversation. Trimming waits
+        until a quarter-window of extra turns has built up, so the history is
+        rebuilt once per batch instead of every turn and the request prefix
+        stays stable in between.
+        """
+        window = self.config.history_window
+        if window <= 0 or self._user_turns <= window + window // 4:
+            return
+
+        # Leading system messages (prompt, shell instructions, summary) are pinned
+        head = 0
+        while head < len(self.messages) and self.messages[head]["role"] == "system":
+            head += 1
+
+        # Find where the window-th most recent user turn starts
+        cut = None
+        turns = 0
+        for i in range(len(self.messages) - 1, head - 1, -1):
+            if self._is_user_turn(self.messages[i]):
+                turns += 1
+                if turns == window:
+                    cut = i
+                    break
 
-        response = requests.post(url, json=payload)
-        if response.status_code != 200:
-            raise Exception(
-                f"Ollama API error: {response.status_code} - {response.text}"
+        if cut is None or cut == head:
+            return
+
+        pinned = [m for m in self.messages[:head] if m is not self._summary_msg]
+        self._summarize_trimmed(self.messages[head:cut])
+        self.messages = pinned + [self._summary_msg] + self.messages[cut:]
+        self._user_turns = window
+
+        if self.config.verbose:
+            rich_print(
+                f"[DEBUG] Trimmed history to last {window} turns ({self._trimmed_count} messages summarized)",
+                style="dim",
             )
 
-        return response.json()
+    def _summarize_trimmed(self, dropped: List[Dict]) -> None:
+        """Fold dropped messages into the running history summary message"""
+        self._trimmed_count += len(dropped)
+
+        for msg in dropped:
+            if self._is_user_turn(msg):
+                self._trimmed_topics.append(msg["content"][:100].strip())
+            elif msg["role"] == "assistant":
+                name = self._call_names.pop(id(msg), None)
+                if name is None:
+                    # Messages restored by /resume were never parsed in this session
+                    function_call = self.parse_function_call(msg["content"])
+                    name = function_call.get("name", "unknown") if function_call else ""
+                if name:
+                    self._trimmed_calls[name] = self._trimmed_calls.get(name, 0) + 1
+
+        lines = [f"Earlier conversation summary ({self._trimmed_count} older messages omitted):"]
+        if self._trimmed_topics:
+            lines.append("User requests:")
+            lines.extend(f"- {topic}" for topic in self._trimmed_topics)
+        if self._trimmed_calls:
+            calls = ", ".join(f"{name} x{count}" for name, count in self._trimmed_calls.items())
+            lines.append(f"Functions called: {calls}")
+
+        # Always a new dict - messages already sent are never edited in place
+        self._summary_msg = {"role": "system", "content": "\n".join(lines)}
+
+    def _model_options_key(self) -> tuple:
+        """Current model parameter values, compared to detect any change"""
+        config = self.config
+        return (
+            config.temperature,
+            config.top_p,
+            config.top_k,
+            config.num_predict,
+            config.repeat_penalty,
+        )
+
+    def _get_model_options(self) -> Dict:
+        """Get model options, rebuilding the dict only after a parameter changed"""
+        options_key = self._model_options_key()
+        if options_key != self._options_key:
+            self._options = self.config.get_model_options()
+            self._options_key = options_key
+        return self._options
+
+    def _refresh_api_urls(self) -> None:
+        """Rebuild endpoint URLs if the API base changed"""
+        if self._urls_base != self.config.api_base:
+            self._urls_base = self.config.api_base
+            self._chat_url = f"{self._urls_base}/api/chat"
+            self._tags_url = f"{self._urls_base}/api/tags"
+
+    def _encode_payload(self, messages: List[Dict], stream: bool) -> bytes:
+        """Serialize a chat request, re-encoding only messages not sent before"""
+        options = self._get_model_options()
+        prefix_key = (self.config.model, self._options_key, stream)
+        if prefix_key != self._payload_prefix_key:
+            head = _json_dumps({"model": self.config.model, "stream": stream, "options": options})
+            self._payload_prefix = head[:-1] + b',"messages":['
+            self._payload_prefix_key = prefix_key
+
+        # Messages are never edited in place, so identity means the bytes are current
+        previous = self._encoded_messages
+        encoded_messages = {}
+        parts = []
+        for message in messages:
+            cached = previous.get(id(message))
+            if cached is not None and cached[0] is message:
+                encoded = cached[1]
+            else:
+                encoded = _json_dumps(message)
+            encoded_messages[id(message)] = (message, encoded)
+            parts.append(encoded)
+        self._encoded_messages = encoded_messages
+
+        return self._payload_prefix + b",".join(parts) + b"]}"
+
+    def clear_response_cache(self) -> None:
+        """Drop all cached model replies"""
+        self._response_cache.clear()
+
+    def stream_ollama_api(self, messages: List[Dict]) -> Iterator[str]:
+        """Call Ollama's REST API with streaming, yielding content chunks as they arrive"""
+        self._refresh_api_urls()
+        body = self._encode_payload(messages, stream=True)
+
+        cache_key = None
+        if self.config.response_cache_enabled:
+            # The body already pins down model, options and history
+            cache_key = hashlib.blake2b(body, digest_size=16).digest()
+            cached = self._response_cache.get(cache_key)
+            if cached is not None:
+                self._response_cache.move_to_end(cache_key)
+                if self.config.verbose:
+                    rich_print("[DEBUG] Response cache hit", style="dim")
+                yield cached
+                return
+
+        parts = []
+
+        with self._session.post(
+            self._chat_url, data=body, headers=_JSON_HEADERS, stream=True
+        ) as response:
+            if response.status_code != 200:
+                raise Exception(
+                    f"Ollama API error: {response.status_code} - {response.text}"
+                )
+
+            for line in response.iter_lines():
+                if not line:
+                    continue
+                chunk = _json_loads(line)
+                if "error" in chunk:
+                    raise Exception(f"Ollama API error: {chunk['error']}")
+
+                content = chunk.get("message", {}).get("content", "")
+                if content:
+                    parts.append(content)
+                    yield content
+                if chunk.get("done"):
+                    break
+
+        # Only complete replies are cached
+        if cache_key is not None:
+            self._response_cache[cache_key] = "".join(parts)
+            if len(self._response_cache) > _RESPONSE_CACHE_SIZE:
+                self._response_cache.popitem(last=False)
 
     def parse_function_call(self, text: str) -> Optional[Dict]:
         """Parse function call from model response"""
-        text = text.strip()
+        # Most replies are plain answers - skip the JSON scan entirely for them
+        marker_idx = text.find(_FUNCTION_CALL_MARKER)
+        if marker_idx == -1:
+            return None
 
-        # Look for JSON function call pattern
-        start_idx = text.find("{")
-        end_idx = text.rfind("}") + 1
+        # The enclosing object must open before the key and close after it
+        start_idx = text.find("{", 0, marker_idx)
+        end_idx = text.rfind("}", marker_idx) + 1
 
         if start_idx == -1 or end_idx == 0:
             return None
 
+        json_str = text[start_idx:end_idx]
         try:
-            json_str = text[start_idx:end_idx]
-            parsed = json.loads(json_str)
+            parsed = _json_loads(json_str)
+        except ValueError:  # Both orjson and json decode errors subclass ValueError
+            return None
 
-            if "function_call" in parsed:
-                return parsed["function_call"]
-        except json.JSONDecodeError:
-            pass
+        if isinstance(parsed, dict) and "function_call" in parsed:
+            return parsed["function_call"]
 
         return None
 
@@ -117,56 +505,65 @@ Use shell commands as your first choice for file/directory operations, then use
         if self.config.verbose:
             return True
 
-        # Keywords that indicate user wants to see content
-        show_keywords = [
-            "show",
-            "display",
-            "view",
-            "see",
-            "content",
-            "contents",
-            "read",
-            "what is",
-            "what's",
-            "tell me about",
-            "examine",
-            "look at",
-            "open",
-            "check",
-            "inspect",
-        ]
-
-        user_lower = user_prompt.lower()
-
         # Show file content when explicitly requested
-        if func_name == "get_file_content":
-            for keyword in show_keywords:
-                if keyword in user_lower:
-                    return True
-
-        # Always show file listings and operations
-        if func_name in ["get_files_info", "write_file", "run_python_file"]:
+        if func_name in _READ_FUNCTIONS and _SHOW_RE.search(user_prompt):
             return True
 
-        return False
+        # Always show file listings and operations
+        return func_name in _ALWAYS_SHOW
 
     def process_conversation_turn(self, user_prompt: str) -> None:
         """Process a single conversation turn"""
         max_function_calls = 5  # Prevent infinite loops
         function_call_count = 0
 
+        self._trim_history()
+
+        # Settings cannot change mid-turn, so read them once
+        config = self.config
+        verbose = config.verbose
+        typing_speed = config.typing_speed
+        typing_enabled = config.typing_enabled
+        rich_enabled = config.rich_enabled
+        syntax_highlighting = config.syntax_highlighting
+        messages = self.messages
+        append_message = self.append_message
+
         while function_call_count < max_function_calls:
             try:
-                response = self.call_ollama_api(self.messages)
-                assistant_response = response["message"]["content"]
+                # Stream the reply so plain answers start printing immediately.
+                # Echoing stops at the first "{" since the rest may be a function call.
+                response_parts = []
+                shown = 0
+                holding = False
+                for chunk in self.stream_ollama_api(messages):
+                    response_parts.append(chunk)
+                    if holding:
+                        continue
+                    brace_idx = chunk.find("{")
+                    if brace_idx != -1:
+                        holding = True
+                        chunk = chunk[:brace_idx]
+                    if chunk:
+                        typewriter_print(
+                            chunk,
+                            typing_speed,
+                            typing_enabled,
+                            style="white",
+                            end="",
+                        )
+                        shown += len(chunk)
+                assistant_response = "".join(response_parts)
 
-                if self.config.verbose:
+                if verbose:
                     rich_print(f"\n--- Function Call {function_call_count + 1} ---", style="dim")
                     rich_print(f"Model response: {assistant_response}", style="dim")
 
                 function_call = self.parse_function_call(assistant_response)
 
                 if function_call:
+                    if shown:
+                        print()  # Finish the streamed preamble line
                     function_call_count += 1
                     func_name = function_call.get("name")
                     func_args = function_call.get("arguments", {})
@@ -174,9 +571,13 @@ Use shell commands as your first choice for file/directory operations, then use
                     rich_print(f"🔧 Calling function: {func_name}", style="bold yellow")
 
                     # Execute function
-                    ai_result, user_result, extra_data = execute_function(
-                        func_name, func_args, self.config.verbose, self.config
-                    )
+                    dispatch = self._function_dispatch.get(func_name)
+                    if dispatch is not None:
+                        ai_result, user_result, extra_data = dispatch(func_args, verbose)
+                    else:
+                        ai_result, user_result, extra_data = execute_function(
+                            func_name, func_args, verbose, config
+                        )
 
                     # Show result if appropriate
                     show_result = self.should_show_function_result(
@@ -188,40 +589,35 @@ Use shell commands as your first choice for file/directory operations, then use
 
                         # Handle different display types
                         if func_name == "get_files_info" and extra_data:
-                            print_file_table(extra_data, self.config.rich_enabled)
+                            print_file_table(extra_data, rich_enabled)
                         elif func_name == "get_file_content" and ":" in user_result:
                             # Extract file info and content
-                            parts = user_result.split(":", 1)
-                            if len(parts) == 2:
-                                header, content = parts
-                                rich_print(header, style="bold cyan")
-                                # Extract language from header
-                                if "(" in header and ")" in header:
-                                    lang_part = (
-                                        header.split("(")[1].split(")")[0].split(",")[0]
-                                    )
-                                    print_syntax_highlighted(
-                                        content,
-                                        lang_part,
-                                        self.config.syntax_highlighting,
-                                    )
-                                else:
-                                    print(content)
+                            header, content = user_result.split(":", 1)
+                            # Extract language from header, e.g. "📄 app.py (python, 120 chars)"
+                            lang_match = _LANG_RE.search(header)
+                            if lang_match:
+                                print_syntax_highlighted(
+                                    content,
+                                    lang_match.group(1).strip(),
+                                    syntax_highlighting,
+                                    header=header,
+                                )
                             else:
-                                print(user_result)
+                                rich_print(header, style="bold cyan")
+                                print(content)
                         else:
                             print(user_result)
                         print()
 
                     # Add function call and result to conversation
-                    self.messages.append(
-                        {"role": "assistant", "content": assistant_response}
-                    )
-                    self.messages.append(
-                        {"role": "user", "content": f"Function result: {ai_result}"}
+                    reply = {"role": "assistant", "content": assistant_response}
+                    append_message(reply)
+                    self._call_names[id(reply)] = func_name or "unknown"
+                    append_message(
+                        {"role": "user", "content": f"{_FUNCTION_RESULT_PREFIX}{ai_result}"}
                     )
 
-                    if self.config.verbose:
+                    if verbose:
                         rich_print(
                             "[DEBUG] Added function result to conversation", style="dim"
                         )
@@ -231,14 +627,14 @@ Use shell commands as your first choice for file/directory operations, then use
                 else:
                     # No function call detected - this is the final response
                     typewriter_print(
-                        assistant_response,
-                        self.config.typing_speed,
-                        self.config.typing_enabled,
+                        assistant_response[shown:],
+                        typing_speed,
+                        typing_enabled,
                         style="white",
                     )
-                    self.messages.append(
-                        {"role": "assistant", "content": assistant_response}
-                    )
+                    reply = {"role": "assistant", "content": assistant_response}
+                    append_message(reply)
+                    self._call_names[id(reply)] = ""
                     break
 
             except Exception as e:
@@ -253,444 +649,636 @@ Use shell commands as your first choice for file/directory operations, then use
 
     def list_models(self) -> None:
         """List available Ollama models"""
+        cached = self._models_cache
+        if (
+            cached is not None
+            and cached[1] == self.config.api_base
+            and time.monotonic() - cached[0] < _MODELS_CACHE_TTL
+        ):
+            print_models_table(cached[2], self.config.model, self.config.rich_enabled)
+            return
+
         try:
-            response = requests.get(f"{self.config.api_base}/api/tags")
+            self._refresh_api_urls()
+            response = self._session.get(self._tags_url)
             if response.status_code == 200:
-                models_data = response.json()
+                models_data = _json_loads(response.content)
                 models = [model["name"] for model in models_data["models"]]
+                self._models_cache = (time.monotonic(), self.config.api_base, models)
                 print_models_table(models, self.config.model, self.config.rich_enabled)
             else:
                 rich_print("No models found or Ollama not running", style="red")
         except Exception as e:
             rich_print(f"Error listing models: {e}", style="red")
 
+    def _build_slash_commands(self) -> Dict[str, Callable[[str], Optional[bool]]]:
+        """Map slash command names to their handlers"""
+        return {
+            "quit": self._cmd_quit,
+            "exit": self._cmd_quit,
+            "q": self._cmd_quit,
+            "help": self._cmd_help,
+            "listmodels": self._cmd_listmodels,
+            "model": self._cmd_model,
+            "clear": self._cmd_clear,
+            "resume": self._cmd_resume,
+            "history": self._cmd_history,
+            "cache": self._cmd_cache,
+            "verbose": self._cmd_verbose,
+            "syntax": self._cmd_syntax,
+            "typing": self._cmd_typing,
+            "prompts": self._cmd_prompts,
+            "prompt": self._cmd_prompt,
+            "showprompt": self._cmd_showprompt,
+            "previewprompt": self._cmd_previewprompt,
+            "editprompt": self._cmd_editprompt,
+            "exportprompts": self._cmd_exportprompts,
+            "params": self._cmd_params,
+            "temperature": self._cmd_temperature,
+            "topp": self._cmd_topp,
+            "topk": self._cmd_topk,
+            "maxtokens": self._cmd_maxtokens,
+            "penalty": self._cmd_penalty,
+            "connect": self._cmd_connect,
+            "status": self._cmd_status,
+            "cd": self._cmd_cd,
+            "safemode": self._cmd_safemode,
+            "allowdir": self._cmd_allowdir,
+            "safedirs": self._cmd_safedirs,
+            "shellcmds": self._cmd_shellcmds,
+            "dirinfo": self._cmd_dirinfo,
+            "pwd": self._cmd_dirinfo,
+            "ls": self._cmd_ls,
+            "cat": self._cmd_cat,
+        }
+
     def handle_slash_command(self, command: str) -> bool:
         """Handle slash commands. Returns True to continue, False to exit"""
-        cmd_parts = command[1:].split()
-        cmd = cmd_parts[0].lower()
-
-        if cmd in ["quit", "exit", "q"]:
-            rich_print("👋 Goodbye!", style="green")
-            return False
+        head, _, tail = command[1:].partition(" ")
+        cmd = head.lower()
+        arg = tail.strip()
 
-        elif cmd == "help":
-            format_help_text(self.config.rich_enabled)
+        handler = self._slash_commands.get(cmd)
+        if handler is None:
+            rich_print(f"❌ Unknown command: /{cmd}", style="red")
+            rich_print("💡 Use /help to see available commands", style="dim")
+            return True
 
-        elif cmd == "listmodels":
-            self.list_models()
+        # Only the quit handler returns False
+        return handler(arg) is not False
 
-        elif cmd == "model":
-            if len(cmd_parts) < 2:
-                rich_print("❌ Usage: /model <model_name>", style="red")
-                rich_print("💡 Use /listmodels to see available models", style="dim")
-            else:
-                new_model = cmd_parts[1]
-                # TODO: Validate model exists
-                self.config.model = new_model
-                rich_print(f"✅ Switched to model: {new_model}", style="green")
-
-        elif cmd == "clear":
-            self.reset_conversation()
-            rich_print("🧹 Conversation history cleared", style="green")
-
-        elif cmd == "verbose":
-            self.config.toggle_verbose()
-            status = "enabled" if self.config.verbose else "disabled"
-            rich_print(f"🔧 Verbose mode {status}", style="blue")
-
-        elif cmd == "syntax":
-            self.config.toggle_syntax_highlighting()
-            status = "enabled" if self.config.syntax_highlighting else "disabled"
-            rich_print(f"🎨 Syntax highlighting {status}", style="blue")
-
-        elif cmd == "typing":
-            if len(cmd_parts) < 2:
-                current_status = (
-                    f"enabled (speed: {self.config.typing_speed})"
-                    if self.config.typing_enabled
-                    else "disabled"
-                )
-                rich_print(f"🎭 Typing animation: {current_status}", style="blue")
-                rich_print("💡 Usage: /typing <speed> or /typing off", style="dim")
-            else:
-                param = cmd_parts[1].lower()
-                if param == "off":
-                    self.config.typing_enabled = False
-                    rich_print("🎭 Typing animation disabled", style="blue")
-                else:
-                    try:
-                        speed = float(param)
-                        if self.config.set_typing_speed(speed):
-                            self.config.typing_enabled = True
-                            rich_print(
-                                f"🎭 Typing animation enabled (speed: {speed})",
-                                style="blue",
-                            )
-                        else:
-                            rich_print(
-                                "❌ Speed must be between 0.005 and 0.2", style="red"
-                            )
-                    except ValueError:
-                        rich_print(
-                            "❌ Invalid speed. Use a number (e.g., 0.03) or 'off'",
-                            style="red",
-                        )
+    def _cmd_quit(self, arg: str) -> bool:
+        """Exit the interactive session"""
+        rich_print("👋 Goodbye!", style="green")
+        return False
 
-        elif cmd == "prompts":
-            prompts = self.prompt_manager.list_available_prompts()
-            from utils.display import print_prompts_table
-            # Convert to old format for display compatibility
-            prompt_descriptions = {name: info['description'] for name, info in prompts.items()}
-            print_prompts_table(prompt_descriptions, self.config.current_prompt, self.config.rich_enabled)
-
-            # Show additional info about file-based prompts
-            file_prompts = [name for name, info in prompts.items() if 'file' in info['source']]
-            if file_prompts:
-                rich_print(f"\n💡 File-based prompts: {', '.join(file_prompts)}", style="dim")
-                rich_print("💡 Edit .md files in prompts/ directory to customize", style="dim")
-
-        elif cmd == "prompt":
-            if len(cmd_parts) < 2:
-                rich_print("❌ Usage: /prompt <prompt_name>", style="red")
-                rich_print("💡 Use /prompts to see available prompts", style="dim")
-            else:
-                prompt_name = cmd_parts[1]
-                content, is_from_file = self.prompt_manager.load_prompt(prompt_name)
-                if content:
-                    self.config.current_prompt = prompt_name
-                    self.reset_conversation()
-                    source = "file" if is_from_file else "built-in"
-                    rich_print(f"✅ Switched to prompt: {prompt_name} ({source})", style="green")
-                    rich_print("🔄 Conversation history cleared for new prompt", style="dim")
-                else:
-                    rich_print(f"❌ Unknown prompt: {prompt_name}", style="red")
-                    rich_print("💡 Use /prompts to see available prompts", style="dim")
+    def _cmd_help(self, arg: str) -> None:
+        """Show help text"""
+        format_help_text(self.config.rich_enabled)
 
-        elif cmd == "showprompt":
-            preview = self.prompt_manager.get_prompt_preview(self.config.current_prompt, max_lines=20)
-            rich_print(preview, style="cyan")
-            rich_print("\n💡 Use /editprompt to modify, /previewprompt <name> for others", style="dim")
+    def _cmd_listmodels(self, arg: str) -> None:
+        """List available models"""
+        self.list_models()
 
-        elif cmd == "previewprompt":
-            if len(cmd_parts) < 2:
-                rich_print("❌ Usage: /previewprompt <prompt_name>", style="red")
-                rich_print("💡 Use /prompts to see available prompts", style="dim")
-            else:
-                prompt_name = cmd_parts[1]
-                max_lines = int(cmd_parts[2]) if len(cmd_parts) > 2 else 15
-                preview = self.prompt_manager.get_prompt_preview(prompt_name, max_lines)
-                rich_print(preview, style="cyan")
-
-        elif cmd == "editprompt":
-            if len(cmd_parts) < 2:
-                rich_print("❌ Usage: /editprompt <prompt_name>", style="red")
-                rich_print("💡 Creates/edits a prompt file in prompts/ directory", style="dim")
-            else:
-                prompt_name = cmd_parts[1]
-                prompt_file = self.prompt_manager.prompts_dir / f"{prompt_name}.md"
-                rich_print(f"📝 Edit prompt file: {prompt_file}", style="blue")
-                rich_print(f"💡 After saving, use /prompt {prompt_name} to switch to it", style="dim")
-
-                # Show current content if exists
-                if prompt_file.exists():
-                    rich_print("📄 Current content preview:", style="dim")
-                    preview = self.prompt_manager.get_prompt_preview(prompt_name, max_lines=5)
-                    rich_print(preview, style="dim")
-
-        elif cmd == "exportprompts":
-            self.prompt_manager.export_builtin_prompts()
-            rich_print("✅ Built-in prompts exported to prompts/ directory", style="green")
-            rich_print("💡 You can now edit the .md files to customize prompts", style="dim")
-
-        elif cmd == "params":
-            params_data = {
-                "🌡️ Temperature": f"{self.config.temperature} (creativity: 0.0=focused, 2.0=chaotic)",
-                "🎯 Top P": f"{self.config.top_p} (nucleus sampling: 0.1=narrow, 1.0=full)",
-                "🔢 Top K": f"{self.config.top_k} (top-k sampling: 1=strict, 100=diverse)",
-                "📏 Max Tokens": f"{self.config.num_predict} (response length limit)",
-                "🔄 Repeat Penalty": f"{self.config.repeat_penalty} (0.5=repetitive, 2.0=no repeats)",
-            }
-            print_model_params_table(params_data, self.config.rich_enabled)
-
-        elif cmd == "temperature":
-            if len(cmd_parts) < 2:
-                rich_print(f"🌡️ Current temperature: {self.config.temperature}", style="blue")
-                rich_print("💡 Usage: /temperature <0.0-2.0>", style="dim")
-                rich_print("   0.0 = Very focused, 0.1 = Balanced, 1.0 = Creative, 2.0 = Chaotic", style="dim")
+    def _cmd_model(self, arg: str) -> None:
+        """Switch model"""
+        if not arg:
+            rich_print("❌ Usage: /model <model_name>", style="red")
+            rich_print("💡 Use /listmodels to see available models", style="dim")
+        else:
+            new_model = arg
+            # TODO: Validate model exists
+            self.config.model = new_model
+            rich_print(f"✅ Switched to model: {new_model}", style="green")
+
+    def _cmd_clear(self, arg: str) -> None:
+        """Clear conversation history"""
+        previous_id = self._log_id if self._log_file is not None else None
+        self.reset_conversation()
+        rich_print("🧹 Conversation history cleared", style="green")
+        if previous_id:
+            rich_print(f"💡 Use /resume {previous_id} to restore it", style="dim")
+
+    def _cmd_resume(self, arg: str) -> None:
+        """List saved sessions or resume one"""
+        if not arg:
+            sessions = self.list_sessions()[:_RESUME_LIST_SIZE]
+            if not sessions:
+                rich_print("📭 No saved sessions", style="blue")
             else:
-                try:
-                    temp = float(cmd_parts[1])
-                    if self.config.set_temperature(temp):
-                        rich_print(f"🌡️ Temperature set to: {temp}", style="blue")
-                    else:
-                        rich_print("❌ Temperature must be between 0.0 and 2.0", style="red")
-                except ValueError:
-                    rich_print("❌ Invalid temperature. Use a number (e.g., 0.7)", style="red")
+                rich_print("🗂️  Recent sessions:", style="blue")
+                for session_id in sessions:
+                    current = " ← current" if session_id == self._log_id else ""
+                    rich_print(f"  {session_id}{current}", style="cyan")
+            rich_print("💡 Usage: /resume <session>", style="dim")
+            return
 
-        elif cmd == "topp":
-            if len(cmd_parts) < 2:
-                rich_print(f"🎯 Current top_p: {self.config.top_p}", style="blue")
-                rich_print("💡 Usage: /topp <0.0-1.0>", style="dim")
+        try:
+            count = self.resume_session(arg)
+        except (OSError, ValueError) as e:
+            rich_print(f"❌ Cannot load session {arg}: {e}", style="red")
+            return
+
+        rich_print(f"✅ Resumed session {arg} ({count} messages)", style="green")
+        if self.warm_up():
+            rich_print("🔥 Server prompt cache warmed", style="dim")
+
+    def _cmd_history(self, arg: str) -> None:
+        """Show or set the history window"""
+        if not arg:
+            window = self.config.history_window
+            current = f"last {window} turns" if window else "unlimited"
+            rich_print(f"🧠 History window: {current}", style="blue")
+            rich_print("💡 Usage: /history <turns> (0 = unlimited)", style="dim")
+        else:
+            try:
+                turns = int(arg)
+                if self.config.set_history_window(turns):
+                    current = f"last {turns} turns" if turns else "unlimited"
+                    rich_print(f"🧠 History window set to: {current}", style="blue")
+                else:
+                    rich_print("❌ History window must be between 0 and 1000", style="red")
+            except ValueError:
+                rich_print("❌ Invalid history window. Use an integer (e.g., 20)", style="red")
+
+    def _cmd_cache(self, arg: str) -> None:
+        """Control the response cache"""
+        if not arg:
+            status = "enabled" if self.config.response_cache_enabled else "disabled"
+            rich_print(
+                f"💾 Response cache: {status} ({len(self._response_cache)} entries)",
+                style="blue",
+            )
+            rich_print("💡 Usage: /cache <on|off|clear>", style="dim")
+            rich_print("💡 When on, asking the same thing again replays the stored reply instead of sampling a new one", style="dim")
+        else:
+            param = arg.lower()
+            if param in ["on", "true", "1", "enable"]:
+                self.config.response_cache_enabled = True
+                rich_print("💾 Response cache enabled", style="blue")
+            elif param in ["off", "false", "0", "disable"]:
+                self.config.response_cache_enabled = False
+                rich_print("💾 Response cache disabled", style="blue")
+            elif param == "clear":
+                self.clear_response_cache()
+                rich_print("🧹 Response cache cleared", style="green")
             else:
-                try:
-                    p = float(cmd_parts[1])
-                    if self.config.set_top_p(p):
-                        rich_print(f"🎯 Top P set to: {p}", style="blue")
-                    else:
-                        rich_print("❌ Top P must be between 0.0 and 1.0", style="red")
-                except ValueError:
-                    rich_print("❌ Invalid top_p. Use a number (e.g., 0.9)", style="red")
-
-        elif cmd == "topk":
-            if len(cmd_parts) < 2:
-                rich_print(f"🔢 Current top_k: {self.config.top_k}", style="blue")
-                rich_print("💡 Usage: /topk <1-100>", style="dim")
+                rich_print("❌ Invalid option. Use 'on', 'off' or 'clear'", style="red")
+
+    def _cmd_verbose(self, arg: str) -> None:
+        """Toggle verbose mode"""
+        self.config.toggle_verbose()
+        status = "enabled" if self.config.verbose else "disabled"
+        rich_print(f"🔧 Verbose mode {status}", style="blue")
+
+    def _cmd_syntax(self, arg: str) -> None:
+        """Toggle syntax highlighting"""
+        self.config.toggle_syntax_highlighting()
+        status = "enabled" if self.config.syntax_highlighting else "disabled"
+        rich_print(f"🎨 Syntax highlighting {status}", style="blue")
+
+    def _cmd_typing(self, arg: str) -> None:
+        """Show or set typing animation"""
+        if not arg:
+            current_status = (
+                f"enabled (speed: {self.config.typing_speed})"
+                if self.config.typing_enabled
+                else "disabled"
+            )
+            rich_print(f"🎭 Typing animation: {current_status}", style="blue")
+            rich_print("💡 Usage: /typing <speed> or /typing off", style="dim")
+        else:
+            param = arg.lower()
+            if param == "off":
+                self.config.typing_enabled = False
+                rich_print("🎭 Typing animation disabled", style="blue")
             else:
                 try:
-                    k = int(cmd_parts[1])
-                    if self.config.set_top_k(k):
-                        rich_print(f"🔢 Top K set to: {k}", style="blue")
+                    speed = float(param)
+                    if self.config.set_typing_speed(speed):
+                        self.config.typing_enabled = True
+                        rich_print(
+                            f"🎭 Typing animation enabled (speed: {speed})",
+                            style="blue",
+                        )
                     else:
-                        rich_print("❌ Top K must be between 1 and 100", style="red")
+                        rich_print(
+                            "❌ Speed must be between 0.005 and 0.2", style="red"
+                        )
                 except ValueError:
-                    rich_print("❌ Invalid top_k. Use an integer (e.g., 40)", style="red")
+                    rich_print(
+                        "❌ Invalid speed. Use a number (e.g., 0.03) or 'off'",
+                        style="red",
+                    )
 
-        elif cmd == "maxtokens":
-            if len(cmd_parts) < 2:
-                rich_print(f"📏 Current max tokens: {self.config.num_predict}", style="blue")
-                rich_print("💡 Usage: /maxtokens <1-8192>", style="dim")
+    def _cmd_prompts(self, arg: str) -> None:
+        """List available system prompts"""
+        prompts = self.prompt_manager.list_available_prompts()
+        # Convert to old format for display compatibility
+        prompt_descriptions = {name: info['description'] for name, info in prompts.items()}
+        print_prompts_table(prompt_descriptions, self.config.current_prompt, self.config.rich_enabled)
+
+        # Show additional info about file-based prompts
+        file_prompts = [name for name, info in prompts.items() if 'file' in info['source']]
+        if file_prompts:
+            rich_print(f"\n💡 File-based prompts: {', '.join(file_prompts)}", style="dim")
+            rich_print("💡 Edit .md files in prompts/ directory to customize", style="dim")
+
+    def _cmd_prompt(self, arg: str) -> None:
+        """Switch system prompt"""
+        if not arg:
+            rich_print("❌ Usage: /prompt <prompt_name>", style="red")
+            rich_print("💡 Use /prompts to see available prompts", style="dim")
+        else:
+            prompt_name = arg
+            content, is_from_file = self.prompt_manager.load_prompt(prompt_name)
+            if content:
+                self.config.current_prompt = prompt_name
+                self.reset_conversation()
+                source = "file" if is_from_file else "built-in"
+                rich_print(f"✅ Switched to prompt: {prompt_name} ({source})", style="green")
+                rich_print("🔄 Conversation history cleared for new prompt", style="dim")
             else:
-                try:
-                    tokens = int(cmd_parts[1])
-                    if self.config.set_num_predict(tokens):
-                        rich_print(f"📏 Max tokens set to: {tokens}", style="blue")
-                    else:
-                        rich_print("❌ Max tokens must be between 1 and 8192", style="red")
-                except ValueError:
-                    rich_print("❌ Invalid max tokens. Use an integer (e.g., 4096)", style="red")
+                rich_print(f"❌ Unknown prompt: {prompt_name}", style="red")
+                rich_print("💡 Use /prompts to see available prompts", style="dim")
 
-        elif cmd == "penalty":
-            if len(cmd_parts) < 2:
-                rich_print(f"🔄 Current repeat penalty: {self.config.repeat_penalty}", style="blue")
-                rich_print("💡 Usage: /penalty <0.5-2.0>", style="dim")
-            else:
-                try:
-                    penalty = float(cmd_parts[1])
-                    if self.config.set_repeat_penalty(penalty):
-                        rich_print(f"🔄 Repeat penalty set to: {penalty}", style="blue")
-                    else:
-                        rich_print("❌ Repeat penalty must be between 0.5 and 2.0", style="red")
-                except ValueError:
-                    rich_print("❌ Invalid repeat penalty. Use a number (e.g., 1.1)", style="red")
+    def _cmd_showprompt(self, arg: str) -> None:
+        """Show current system prompt"""
+        preview = self.prompt_manager.get_prompt_preview(self.config.current_prompt, max_lines=20)
+        rich_print(preview, style="cyan")
+        rich_print("\n💡 Use /editprompt to modify, /previewprompt <name> for others", style="dim")
+
+    def _cmd_previewprompt(self, arg: str) -> None:
+        """Preview a system prompt"""
+        if not arg:
+            rich_print("❌ Usage: /previewprompt <prompt_name>", style="red")
+            rich_print("💡 Use /prompts to see available prompts", style="dim")
+        else:
+            prompt_name, _, tail = arg.partition(" ")
+            count = tail.split(None, 1)
+            try:
+                max_lines = int(count[0]) if count else 15
+            except ValueError:
+                rich_print("❌ Invalid line count. Usage: /previewprompt <prompt_name> [lines]", style="red")
+                return
+            preview = self.prompt_manager.get_prompt_preview(prompt_name, max_lines)
+            rich_print(preview, style="cyan")
 
-        elif cmd == "connect":
-            if len(cmd_parts) < 2:
-                rich_print(f"🌐 Current API base: {self.config.api_base}", style="blue")
-                rich_print("💡 Usage: /connect <url>", style="dim")
-                rich_print("   Example: /connect http://192.168.1.100:11434", style="dim")
-            else:
-                url = cmd_parts[1]
-                if self.config.set_api_base(url):
-                    rich_print(f"🌐 Testing connection to: {url}", style="blue")
-                    if test_ollama_connection(url):
-                        rich_print(f"✅ Connected to remote Ollama: {url}", style="green")
-                    else:
-                        rich_print(f"❌ Failed to connect to: {url}", style="red")
-                        rich_print("💡 Make sure Ollama is running and accessible", style="dim")
+    def _cmd_editprompt(self, arg: str) -> None:
+        """Show where to edit a prompt file"""
+        if not arg:
+            rich_print("❌ Usage: /editprompt <prompt_name>", style="red")
+            rich_print("💡 Creates/edits a prompt file in prompts/ directory", style="dim")
+        else:
+            prompt_name = arg
+            prompt_file = self.prompt_manager.prompts_dir / f"{prompt_name}.md"
+            rich_print(f"📝 Edit prompt file: {prompt_file}", style="blue")
+            rich_print(f"💡 After saving, use /prompt {prompt_name} to switch to it", style="dim")
+
+            # Show current content if exists
+            if prompt_file.exists():
+                rich_print("📄 Current content preview:", style="dim")
+                preview = self.prompt_manager.get_prompt_preview(prompt_name, max_lines=5)
+                rich_print(preview, style="dim")
+
+    def _cmd_exportprompts(self, arg: str) -> None:
+        """Export built-in prompts to files"""
+        self.prompt_manager.export_builtin_prompts()
+        rich_print("✅ Built-in prompts exported to prompts/ directory", style="green")
+        rich_print("💡 You can now edit the .md files to customize prompts", style="dim")
+
+    def _cmd_params(self, arg: str) -> None:
+        """Show model parameters"""
+        params_data = {
+            "🌡️ Temperature": f"{self.config.temperature} (creativity: 0.0=focused, 2.0=chaotic)",
+            "🎯 Top P": f"{self.config.top_p} (nucleus sampling: 0.1=narrow, 1.0=full)",
+            "🔢 Top K": f"{self.config.top_k} (top-k sampling: 1=strict, 100=diverse)",
+            "📏 Max Tokens": f"{self.config.num_predict} (response length limit)",
+            "🔄 Repeat Penalty": f"{self.config.repeat_penalty} (0.5=repetitive, 2.0=no repeats)",
+        }
+        print_model_params_table(params_data, self.config.rich_enabled)
+
+    def _cmd_temperature(self, arg: str) -> None:
+        """Show or set temperature"""
+        if not arg:
+            rich_print(f"🌡️ Current temperature: {self.config.temperature}", style="blue")
+            rich_print("💡 Usage: /temperature <0.0-2.0>", style="dim")
+            rich_print("   0.0 = Very focused, 0.1 = Balanced, 1.0 = Creative, 2.0 = Chaotic", style="dim")
+        else:
+            try:
+                temp = float(arg)
+                if self.config.set_temperature(temp):
+                    rich_print(f"🌡️ Temperature set to: {temp}", style="blue")
                 else:
-                    rich_print("❌ Invalid URL. Must start with http:// or https://", style="red")
-
-        elif cmd == "status":
-            status_data = {
-                "🤖 Model": self.config.model,
-                "🌐 API Base": self.config.api_base,
-                "📋 System Prompt": self.config.current_prompt,
-                "💬 Conversation turns": len(
-                    [m for m in self.messages if m["role"] != "system"]
-                ),
-                "🔧 Verbose mode": "enabled" if self.config.verbose else "disabled",
-                "🎨 Syntax highlighting": (
-                    "enabled" if self.config.syntax_highlighting else "disabled"
-                ),
-                "🎭 Typing animation": (
-                    f"enabled (speed: {self.config.typing_speed})"
-                    if self.config.typing_enabled
-                    else "disabled"
-                ),
-                "🌡️ Temperature": str(self.config.temperature),
-                "🎯 Top P": str(self.config.top_p),
-                "🔢 Top K": str(self.config.top_k),
-                "📏 Max Tokens": str(self.config.num_predict),
-                "🔄 Repeat Penalty": str(self.config.repeat_penalty),
-                "🖥️  Shell Commands": "enabled" if self.config.shell_commands_enabled else "disabled",
-                "📂 Working directory": os.getcwd(),
-            }
-            print_status_table(status_data, self.config.rich_enabled)
-
-        elif cmd == "cd":
-            if len(cmd_parts) < 2:
-                # Show current directory and safety info
-                rich_print(format_directory_safety_info(), style="blue")
-                rich_print("\n💡 Usage: /cd <directory>", style="dim")
-                rich_print("💡 Use /cd --force <directory> for sensitive directories", style="dim")
-                rich_print("💡 Use /safedirs to see suggested safe directories", style="dim")
+                    rich_print("❌ Temperature must be between 0.0 and 2.0", style="red")
+            except ValueError:
+                rich_print("❌ Invalid temperature. Use a number (e.g., 0.7)", style="red")
+
+    def _cmd_topp(self, arg: str) -> None:
+        """Show or set top_p"""
+        if not arg:
+            rich_print(f"🎯 Current top_p: {self.config.top_p}", style="blue")
+            rich_print("💡 Usage: /topp <0.0-1.0>", style="dim")
+        else:
+            try:
+                p = float(arg)
+                if self.config.set_top_p(p):
+                    rich_print(f"🎯 Top P set to: {p}", style="blue")
+                else:
+                    rich_print("❌ Top P must be between 0.0 and 1.0", style="red")
+            except ValueError:
+                rich_print("❌ Invalid top_p. Use a number (e.g., 0.9)", style="red")
+
+    def _cmd_topk(self, arg: str) -> None:
+        """Show or set top_k"""
+        if not arg:
+            rich_print(f"🔢 Current top_k: {self.config.top_k}", style="blue")
+            rich_print("💡 Usage: /topk <1-100>", style="dim")
+        else:
+            try:
+                k = int(arg)
+                if self.config.set_top_k(k):
+                    rich_print(f"🔢 Top K set to: {k}", style="blue")
+                else:
+                    rich_print("❌ Top K must be between 1 and 100", style="red")
+            except ValueError:
+                rich_print("❌ Invalid top_k. Use an integer (e.g., 40)", style="red")
+
+    def _cmd_maxtokens(self, arg: str) -> None:
+        """Show or set max tokens"""
+        if not arg:
+            rich_print(f"📏 Current max tokens: {self.config.num_predict}", style="blue")
+            rich_print("💡 Usage: /maxtokens <1-8192>", style="dim")
+        else:
+            try:
+                tokens = int(arg)
+                if self.config.set_num_predict(tokens):
+                    rich_print(f"📏 Max tokens set to: {tokens}", style="blue")
+                else:
+                    rich_print("❌ Max tokens must be between 1 and 8192", style="red")
+            except ValueError:
+                rich_print("❌ Invalid max tokens. Use an integer (e.g., 4096)", style="red")
+
+    def _cmd_penalty(self, arg: str) -> None:
+        """Show or set repeat penalty"""
+        if not arg:
+            rich_print(f"🔄 Current repeat penalty: {self.config.repeat_penalty}", style="blue")
+            rich_print("💡 Usage: /penalty <0.5-2.0>", style="dim")
+        else:
+            try:
+                penalty = float(arg)
+                if self.config.set_repeat_penalty(penalty):
+                    rich_print(f"🔄 Repeat penalty set to: {penalty}", style="blue")
+                else:
+                    rich_print("❌ Repeat penalty must be between 0.5 and 2.0", style="red")
+            except ValueError:
+                rich_print("❌ Invalid repeat penalty. Use a number (e.g., 1.1)", style="red")
+
+    def _cmd_connect(self, arg: str) -> None:
+        """Connect to an Ollama instance"""
+        if not arg:
+            rich_print(f"🌐 Current API base: {self.config.api_base}", style="blue")
+            rich_print("💡 Usage: /connect <url>", style="dim")
+            rich_print("   Example: /connect http://192.168.1.100:11434", style="dim")
+        else:
+            url = arg
+            if self.config.set_api_base(url):
+                self._models_cache = None
+                rich_print(f"🌐 Testing connection to: {url}", style="blue")
+                if test_ollama_connection(url):
+                    rich_print(f"✅ Connected to remote Ollama: {url}", style="green")
+                else:
+                    rich_print(f"❌ Failed to connect to: {url}", style="red")
+                    rich_print("💡 Make sure Ollama is running and accessible", style="dim")
             else:
-                force = False
-                target_dir = cmd_parts[1]
-
-                # Check for --force flag
-                if target_dir == "--force" and len(cmd_parts) > 2:
-                    force = True
-                    target_dir = cmd_parts[2]
-                elif target_dir.startswith("--force="):
-                    force = True
-                    target_dir = target_dir[8:]  # Remove --force= prefix
-
-                success, message = safe_change_directory(
-                    target_dir,
-                    self.config.safe_mode,
-                    self.config.allowed_base_dirs,
-                    force
-                )
+                rich_print("❌ Invalid URL. Must start with http:// or https://", style="red")
+
+    def _cmd_status(self, arg: str) -> None:
+        """Show session status"""
+        status_data = {
+            "🤖 Model": self.config.model,
+            "🌐 API Base": self.config.api_base,
+            "📋 System Prompt": self.config.current_prompt,
+            "💬 Conversation turns": len(
+                [m for m in self.messages if m["role"] != "system"]
+            ),
+            "🧠 History window": (
+                f"last {self.config.history_window} turns"
+                if self.config.history_window
+                else "unlimited"
+            ),
+            "🔧 Verbose mode": "enabled" if self.config.verbose else "disabled",
+            "🎨 Syntax highlighting": (
+                "enabled" if self.config.syntax_highlighting else "disabled"
+            ),
+            "🎭 Typing animation": (
+                f"enabled (speed: {self.config.typing_speed})"
+                if self.config.typing_enabled
+                else "disabled"
+            ),
+            "🌡️ Temperature": str(self.config.temperature),
+            "🎯 Top P": str(self.config.top_p),
+            "🔢 Top K": str(self.config.top_k),
+            "📏 Max Tokens": str(self.config.num_predict),
+            "🔄 Repeat Penalty": str(self.config.repeat_penalty),
+            "🖥️  Shell Commands": "enabled" if self.config.shell_commands_enabled else "disabled",
+            "📂 Working directory": self._cwd,
+            "🗂️  Session": self._log_id if self.config.session_log_enabled else "not logged",
+        }
+        print_status_table(status_data, self.config.rich_enabled)
+
+    def _cmd_cd(self, arg: str) -> None:
+        """Change working directory"""
+        if not arg:
+            # Show current directory and safety info
+            rich_print(format_directory_safety_info(), style="blue")
+            rich_print("\n💡 Usage: /cd <directory>", style="dim")
+            rich_print("💡 Use /cd --force <directory> for sensitive directories", style="dim")
+            rich_print("💡 Use /safedirs to see suggested safe directories", style="dim")
+        else:
+            force = False
+            target_dir = arg
+
+            # Check for --force flag
+            flag, _, rest = arg.partition(" ")
+            if flag == "--force" and rest:
+                force = True
+                target_dir = rest.lstrip()
+            elif target_dir.startswith("--force="):
+                force = True
+                target_dir = target_dir[8:]  # Remove --force= prefix
+
+            success, message = safe_change_directory(
+                target_dir,
+                self.config.safe_mode,
+                self.config.allowed_base_dirs,
+                force
+            )
 
-                if success:
-                    rich_print(message, style="green")
-                    # Update prompt to show new directory if it fits
-                    new_dir = os.path.basename(os.getcwd())
-                    if len(new_dir) < 20:
-                        rich_print(f"💡 Prompt will show: [{self.config.model}:{new_dir}]>", style="dim")
-                else:
-                    rich_print(message, style="red")
-
-        elif cmd == "safemode":
-            if len(cmd_parts) < 2:
-                status = "enabled" if self.config.safe_mode else "disabled"
-                rich_print(f"🛡️  Safe mode: {status}", style="blue")
-                rich_print("💡 Usage: /safemode <on|off>", style="dim")
-                rich_print("💡 Safe mode prevents access to system directories", style="dim")
+            if success:
+                self._cwd = os.getcwd()
+                rich_print(message, style="green")
+                # Update prompt to show new directory if it fits
+                new_dir = os.path.basename(self._cwd)
+                if len(new_dir) < 20:
+                    rich_print(f"💡 Prompt will show: [{self.config.model}:{new_dir}]>", style="dim")
+            else:
+                rich_print(message, style="red")
+
+    def _cmd_safemode(self, arg: str) -> None:
+        """Show or toggle safe mode"""
+        if not arg:
+            status = "enabled" if self.config.safe_mode else "disabled"
+            rich_print(f"🛡️  Safe mode: {status}", style="blue")
+            rich_print("💡 Usage: /safemode <on|off>", style="dim")
+            rich_print("💡 Safe mode prevents access to system directories", style="dim")
+        else:
+            param = arg.lower()
+            if param in ["on", "true", "1", "enable"]:
+                self.config.safe_mode = True
+                rich_print("🛡️  Safe mode enabled", style="green")
+            elif param in ["off", "false", "0", "disable"]:
+                rich_print("⚠️  WARNING: Disabling safe mode allows access to system directories!", style="yellow")
+                rich_print("💡 This could be dangerous. Use /safemode on to re-enable.", style="yellow")
+                self.config.safe_mode = False
+                rich_print("🛡️  Safe mode disabled", style="red")
             else:
-                param = cmd_parts[1].lower()
-                if param in ["on", "true", "1", "enable"]:
-                    self.config.safe_mode = True
-                    rich_print("🛡️  Safe mode enabled", style="green")
-                elif param in ["off", "false", "0", "disable"]:
-                    rich_print("⚠️  WARNING: Disabling safe mode allows access to system directories!", style="yellow")
-                    rich_print("💡 This could be dangerous. Use /safemode on to re-enable.", style="yellow")
-                    self.config.safe_mode = False
-                    rich_print("🛡️  Safe mode disabled", style="red")
+                rich_print("❌ Invalid option. Use 'on' or 'off'", style="red")
+
+    def _cmd_allowdir(self, arg: str) -> None:
+        """List, add or remove allowed directories"""
+        if not arg:
+            rich_print("📁 Currently allowed base directories:", style="blue")
+            for i, dir_path in enumerate(self.config.allowed_base_dirs, 1):
+                rich_print(f"  {i}. {dir_path}", style="cyan")
+            rich_print("\n💡 Usage: /allowdir <directory>", style="dim")
+            rich_print("💡 Use /allowdir --remove <directory> to remove", style="dim")
+        else:
+            flag, _, rest = arg.partition(" ")
+            if flag == "--remove" and rest:
+                dir_to_remove = os.path.abspath(rest.lstrip())
+                if dir_to_remove in self.config.allowed_base_dirs:
+                    self.config.allowed_base_dirs.remove(dir_to_remove)
+                    rich_print(f"✅ Removed from allowed directories: {dir_to_remove}", style="green")
                 else:
-                    rich_print("❌ Invalid option. Use 'on' or 'off'", style="red")
-
-        elif cmd == "allowdir":
-            if len(cmd_parts) < 2:
-                rich_print("📁 Currently allowed base directories:", style="blue")
-                for i, dir_path in enumerate(self.config.allowed_base_dirs, 1):
-                    rich_print(f"  {i}. {dir_path}", style="cyan")
-                rich_print("\n💡 Usage: /allowdir <directory>", style="dim")
-                rich_print("💡 Use /allowdir --remove <directory> to remove", style="dim")
+                    rich_print(f"❌ Directory not in allowed list: {dir_to_remove}", style="red")
             else:
-                if cmd_parts[1] == "--remove" and len(cmd_parts) > 2:
-                    dir_to_remove = os.path.abspath(cmd_parts[2])
-                    if dir_to_remove in self.config.allowed_base_dirs:
-                        self.config.allowed_base_dirs.remove(dir_to_remove)
-                        rich_print(f"✅ Removed from allowed directories: {dir_to_remove}", style="green")
+                new_dir = os.path.abspath(arg)
+                if os.path.exists(new_dir) and os.path.isdir(new_dir):
+                    if new_dir not in self.config.allowed_base_dirs:
+                        self.config.allowed_base_dirs.append(new_dir)
+                        rich_print(f"✅ Added to allowed directories: {new_dir}", style="green")
                     else:
-                        rich_print(f"❌ Directory not in allowed list: {dir_to_remove}", style="red")
+                        rich_print(f"💡 Directory already allowed: {new_dir}", style="blue")
                 else:
-                    new_dir = os.path.abspath(cmd_parts[1])
-                    if os.path.exists(new_dir) and os.path.isdir(new_dir):
-                        if new_dir not in self.config.allowed_base_dirs:
-                            self.config.allowed_base_dirs.append(new_dir)
-                            rich_print(f"✅ Added to allowed directories: {new_dir}", style="green")
-                        else:
-                            rich_print(f"💡 Directory already allowed: {new_dir}", style="blue")
-                    else:
-                        rich_print(f"❌ Directory does not exist: {new_dir}", style="red")
-
-        elif cmd == "safedirs":
-            safe_dirs = suggest_safe_directories()
-            rich_print("💡 Suggested safe directories for development:", style="blue")
-            for i, dir_path in enumerate(safe_dirs, 1):
-                exists = "✅" if os.path.exists(dir_path) else "❌"
-                rich_print(f"  {i}. {exists} {dir_path}", style="cyan")
-            rich_print("\n💡 Use /cd <directory> to change to any of these", style="dim")
-            rich_print("💡 Use /allowdir <directory> to add custom allowed directories", style="dim")
-
-        elif cmd == "shellcmds":
-            if len(cmd_parts) < 2:
-                status = "enabled" if self.config.shell_commands_enabled else "disabled"
-                rich_print(f"🖥️  Shell commands: {status}", style="blue")
-                rich_print("💡 Usage: /shellcmds <on|off>", style="dim")
-                rich_print("💡 Controls whether AI can execute shell commands", style="dim")
+                    rich_print(f"❌ Directory does not exist: {new_dir}", style="red")
+
+    def _cmd_safedirs(self, arg: str) -> None:
+        """Suggest safe directories"""
+        safe_dirs = suggest_safe_directories()
+        existing = existing_directories(safe_dirs)
+        rich_print("💡 Suggested safe directories for development:", style="blue")
+        for i, dir_path in enumerate(safe_dirs, 1):
+            exists = "✅" if dir_path in existing else "❌"
+            rich_print(f"  {i}. {exists} {dir_path}", style="cyan")
+        rich_print("\n💡 Use /cd <directory> to change to any of these", style="dim")
+        rich_print("💡 Use /allowdir <directory> to add custom allowed directories", style="dim")
+
+    def _cmd_shellcmds(self, arg: str) -> None:
+        """Enable or disable shell commands"""
+        if not arg:
+            status = "enabled" if self.config.shell_commands_enabled else "disabled"
+            rich_print(f"🖥️  Shell commands: {status}", style="blue")
+            rich_print("💡 Usage: /shellcmds <on|off>", style="dim")
+            rich_print("💡 Controls whether AI can execute shell commands", style="dim")
+        else:
+            param = arg.lower()
+            if param in ["on", "true", "1", "enable"]:
+                self.config.shell_commands_enabled = True
+                # Add shell command instructions, keeping the conversation
+                self.set_shell_instructions(True)
+                rich_print("🖥️  Shell commands enabled", style="green")
+                rich_print("💡 AI can now use mkdir, touch, ls, etc.", style="dim")
+                rich_print("🔄 Shell command instructions added to conversation", style="dim")
+            elif param in ["off", "false", "0", "disable"]:
+                self.config.shell_commands_enabled = False
+                # Remove shell command instructions, keeping the conversation
+                self.set_shell_instructions(False)
+                rich_print("🖥️  Shell commands disabled (KILL SWITCH ACTIVATED)", style="red")
+                rich_print("💡 AI cannot execute any shell commands", style="dim")
+                rich_print("🔄 Shell command instructions removed from conversation", style="dim")
             else:
-                param = cmd_parts[1].lower()
-                if param in ["on", "true", "1", "enable"]:
-                    self.config.shell_commands_enabled = True
-                    # Reset conversation to include shell command instructions
-                    self.reset_conversation()
-                    rich_print("🖥️  Shell commands enabled", style="green")
-                    rich_print("💡 AI can now use mkdir, touch, ls, etc.", style="dim")
-                    rich_print("🔄 Conversation reset with shell command instructions", style="dim")
-                elif param in ["off", "false", "0", "disable"]:
-                    self.config.shell_commands_enabled = False
-                    # Reset conversation to remove shell command instructions
-                    self.reset_conversation()
-                    rich_print("🖥️  Shell commands disabled (KILL SWITCH ACTIVATED)", style="red")
-                    rich_print("💡 AI cannot execute any shell commands", style="dim")
-                    rich_print("🔄 Conversation reset without shell command instructions", style="dim")
-                else:
-                    rich_print("❌ Invalid option. Use 'on' or 'off'", style="red")
-
-        elif cmd == "dirinfo" or cmd == "pwd":
-            target_dir = cmd_parts[1] if len(cmd_parts) > 1 else "."
-            try:
-                rich_print(format_directory_safety_info(target_dir), style="blue")
-            except Exception as e:
-                rich_print(f"❌ Error getting directory info: {e}", style="red")
+                rich_print("❌ Invalid option. Use 'on' or 'off'", style="red")
 
-        elif cmd == "ls":
-            directory = cmd_parts[1] if len(cmd_parts) > 1 else "."
-            try:
-                files = os.listdir(directory)
-                rich_print(f"📁 Files in '{directory}':", style="bold blue")
-                for file in sorted(files):
-                    full_path = os.path.join(directory, file)
-                    if os.path.isdir(full_path):
-                        rich_print(f"  📁 {file}/", style="cyan")
-                    else:
-                        size = os.path.getsize(full_path)
-                        rich_print(f"  📄 {file} ({size} bytes)", style="white")
-            except Exception as e:
-                rich_print(f"❌ Error listing directory: {e}", style="red")
+    def _cmd_dirinfo(self, arg: str) -> None:
+        """Show directory safety information"""
+        target_dir = arg or "."
+        try:
+            rich_print(format_directory_safety_info(target_dir), style="blue")
+        except Exception as e:
+            rich_print(f"❌ Error getting directory info: {e}", style="red")
 
-        elif cmd == "cat":
-            if len(cmd_parts) < 2:
-                rich_print("❌ Usage: /cat <filename>", style="red")
-            else:
-                filename = cmd_parts[1]
-                try:
-                    with open(filename, "r", encoding="utf-8") as f:
-                        content = f.read()
-                        if len(content) > 1500:
-                            content = (
-                                content[:1500]
-                                + f"\n... [truncated - showing first 1500 of {len(content)} characters]"
-                            )
-                            content += f"\n💡 Use AI prompt 'show me the full content of {filename}' for complete file"
-
-                        rich_print(f"📄 Content of '{filename}':", style="bold cyan")
-                        language = get_file_language(filename)
-                        print_syntax_highlighted(
-                            content, language, self.config.syntax_highlighting
-                        )
-                except Exception as e:
-                    rich_print(f"❌ Error reading file: {e}", style="red")
+    def _cmd_ls(self, arg: str) -> None:
+        """Quick file listing"""
+        directory = arg or "."
+        try:
+            # scandir reports entry types from the directory read, so only files need a stat
+            with os.scandir(directory) as it:
+                entries = sorted(it, key=attrgetter("name"))
+            lines = [(f"📁 Files in '{directory}':", "bold blue")]
+            lines.extend(
+                (f"  📁 {entry.name}/", "cyan")
+                if entry.is_dir()
+                else (f"  📄 {entry.name} ({entry.stat().st_size} bytes)", "white")
+                for entry in entries
+            )
+            print_styled_lines(lines)
+        except Exception as e:
+            rich_print(f"❌ Error listing directory: {e}", style="red")
 
+    def _cmd_cat(self, arg: str) -> None:
+        """Quick file content view"""
+        if not arg:
+            rich_print("❌ Usage: /cat <filename>", style="red")
         else:
-            rich_print(f"❌ Unknown command: /{cmd}", style="red")
-            rich_print("💡 Use /help to see available commands", style="dim")
-
-        return True
+            filename = arg
+            try:
+                # Invalid UTF-8 is replaced instead of aborting the view
+                with open(filename, "r", encoding="utf-8", errors="replace") as f:
+                    # Read one character past the limit to detect truncation without loading the file
+                    content = f.read(_CAT_MAX_CHARS + 1)
+                    if "\x00" in content:
+                        self._print_hex_head(filename)
+                        return
+                    if len(content) > _CAT_MAX_CHARS:
+                        total = os.fstat(f.fileno()).st_size
+                        content = (
+                            content[:_CAT_MAX_CHARS]
+                            + f"\n... [truncated - showing first {_CAT_MAX_CHARS} characters of {total} bytes]"
+                        )
+                        content += f"\n💡 Use AI prompt 'show me the full content of {filename}' for complete file"
+
+                    language = get_file_language(filename)
+                    print_syntax_highlighted(
+                        content,
+                        language,
+                        self.config.syntax_highlighting,
+                        header=f"📄 Content of '{filename}':",
+                    )
+            except Exception as e:
+                rich_print(f"❌ Error reading file: {e}", style="red")
+
+    def _print_hex_head(self, filename: str) -> None:
+        """Show the first bytes of a binary file as a hex dump"""
+        with open(filename, "rb") as f:
+            data = f.read(_CAT_HEX_BYTES)
+            total = os.fstat(f.fileno()).st_size
+        lines = [(f"📦 Binary file '{filename}' ({total} bytes), first {len(data)} bytes:", "bold cyan")]
+        for offset in range(0, len(data), 16):
+            row = data[offset:offset + 16]
+            text = "".join(chr(b) if 32 <= b < 127 else "." for b in row)
+            lines.append((f"  {offset:08x}  {row.hex(' '):<47}  {text}", "white"))
+        print_styled_lines(lines)
 
     def run_interactive(self) -> None:
         """Run in interactive mode"""
@@ -700,7 +1288,7 @@ Use shell commands as your first choice for file/directory operations, then use
             "System Prompt": self.config.current_prompt,
             "Temperature": str(self.config.temperature),
             "Safe Mode": "enabled" if self.config.safe_mode else "disabled",
-            "Working Dir": os.path.basename(os.getcwd()) or os.getcwd(),
+            "Working Dir": os.path.basename(self._cwd) or self._cwd,
             "Syntax highlighting": (
                 "enabled" if self.config.syntax_highlighting else "disabled"
             ),
@@ -722,7 +1310,7 @@ Use shell commands as your first choice for file/directory operations, then use
             while True:
                 try:
                     # Dynamic prompt showing current directory
-                    current_dir = os.path.basename(os.getcwd())
+                    current_dir = os.path.basename(self._cwd)
                     if current_dir and len(current_dir) < 20:
                         prompt = f"\n[{self.config.model}:{current_dir}]> "
                     else:
@@ -740,7 +1328,7 @@ Use shell commands as your first choice for file/directory operations, then use
                         continue
 
                     # Regular AI prompt
-                    self.messages.append({"role": "user", "content": user_input})
+                    self.append_message({"role": "user", "content": user_input})
                     self.process_conversation_turn(user_input)
 
                 except KeyboardInterrupt:
@@ -757,5 +1345,5 @@ Use shell commands as your first choice for file/directory operations, then use
 
     def run_single_prompt(self, prompt: str) -> None:
         """Run a single prompt"""
-        self.messages.append({"role": "user", "content": prompt})
+        self.append_message({"role": "user", "content": prompt})
         self.process_conversation_turn(prompt)
@@ -2,8 +2,26 @@
 Configuration management for the Ollama AI Agent
 """
 
-from dataclasses import dataclass
-from typing import List, Dict
+import os
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import List, Dict, Tuple
+
+
+@lru_cache(maxsize=1)
+def _base_dirs() -> Tuple[str, ...]:
+    """Home and startup directories, looked up once per process"""
+    return (
+        os.path.expanduser("~"),  # User home directory
+        os.getcwd(),              # Current working directory
+        "/tmp",                   # Temporary directory
+        "/var/tmp",               # Alternative temp directory
+    )
+
+
+def _default_allowed_dirs() -> List[str]:
+    """Default allowed base directories, as a fresh list per config"""
+    return list(_base_dirs())
 
 
 @dataclass
@@ -29,24 +47,25 @@ class AgentConfig:
     # System prompt management
     current_prompt: str = "default"
 
+    # Conversation memory: user turns kept in full (0 = unlimited)
+    history_window: int = 20
+
+    # Replay stored replies for identical requests (opt-in: a replay returns the
+    # same text even when temperature > 0 would have sampled a new one)
+    response_cache_enabled: bool = False
+
+    # Append-only JSONL log of each conversation, for /resume (opt-in: it
+    # records everything the model saw, including file contents and command output)
+    session_log_enabled: bool = False
+    session_log_dir: str = "~/.ollama-agent/history"
+
     # Directory safety settings
     safe_mode: bool = True
-    allowed_base_dirs: List[str] = None
+    allowed_base_dirs: List[str] = field(default_factory=_default_allowed_dirs)
 
     # Shell command safety
     shell_commands_enabled: bool = True  # Can be disabled as kill switch
 
-    def __post_init__(self):
-        """Initialize default allowed directories"""
-        if self.allowed_base_dirs is None:
-            import os
-            self.allowed_base_dirs = [
-                os.path.expanduser("~"),  # User home directory
-                os.getcwd(),              # Current working directory
-                "/tmp",                   # Temporary directory
-                "/var/tmp",               # Alternative temp directory
-            ]
-
     def toggle_verbose(self) -> None:
         """Toggle verbose mode"""
         self.verbose = not self.verbose
@@ -101,6 +120,13 @@ class AgentConfig:
             return True
         return False
 
+    def set_history_window(self, turns: int) -> bool:
+        """Set history window, returns True if valid"""
+        if 0 <= turns <= 1000:
+            self.history_window = turns
+            return True
+        return False
+
     def set_api_base(self, url: str) -> bool:
         """Set API base URL, returns True if valid"""
         if url.startswith(('http://', 'https://')):
@@ -120,23 +146,23 @@ class AgentConfig:
 
 
 # Legacy function for backwards compatibility
+@lru_cache(maxsize=1)
+def _prompt_manager():
+    """Shared PromptManager, imported and built on first use"""
+    from core.prompt_manager import PromptManager
+    return PromptManager()
+
+
 def get_system_prompt(prompt_name: str) -> str:
     """Get system prompt by name - now redirects to PromptManager"""
-    from core.prompt_manager import PromptManager
-    manager = PromptManager()
-    content, _ = manager.load_prompt(prompt_name)
+    content, _ = _prompt_manager().load_prompt(prompt_name)
     return content if content else "You are a helpful AI assistant."
 
 
 def list_system_prompts() -> Dict[str, str]:
     """Get all available system prompts with descriptions"""
-    from core.prompt_manager import PromptManager
-    manager = PromptManager()
-    prompts = manager.list_available_prompts()
+    # Listing only scans file names; prompt bodies are read by get_system_prompt
+    prompts = _prompt_manager().list_available_prompts()
 
     # Convert to old format for compatibility
-    descriptions = {}
-    for name, info in prompts.items():
-        descriptions[name] = info['description']
-
-    return descriptions
+    return {name: info['description'] for name, info in prompts.items()}
@@ -2,69 +2,124 @@
 Function execution handlers for the AI agent
 """
 
+import codecs
 import os
+import re
 import sys
 import subprocess
 import platform
-from typing import Dict, Tuple, List
+import shutil
+import stat
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Callable, Dict, Tuple, List, Optional
 from utils.display import rich_print
 
 
+# File extension -> syntax highlighting language, built once at import
+_LANGUAGE_MAP = {
+    ".py": "python",
+    ".js": "javascript",
+    ".ts": "typescript",
+    ".jsx": "jsx",
+    ".tsx": "tsx",
+    ".java": "java",
+    ".cpp": "cpp",
+    ".c": "c",
+    ".h": "c",
+    ".cs": "csharp",
+    ".php": "php",
+    ".rb": "ruby",
+    ".go": "go",
+    ".rs": "rust",
+    ".swift": "swift",
+    ".kt": "kotlin",
+    ".scala": "scala",
+    ".sh": "bash",
+    ".bash": "bash",
+    ".zsh": "bash",
+    ".fish": "fish",
+    ".ps1": "powershell",
+    ".html": "html",
+    ".htm": "html",
+    ".xml": "xml",
+    ".css": "css",
+    ".scss": "scss",
+    ".sass": "sass",
+    ".less": "less",
+    ".json": "json",
+    ".yaml": "yaml",
+    ".yml": "yaml",
+    ".toml": "toml",
+    ".ini": "ini",
+    ".cfg": "ini",
+    ".conf": "ini",
+    ".sql": "sql",
+    ".md": "markdown",
+    ".markdown": "markdown",
+    ".rst": "rst",
+    ".txt": "text",
+    ".log": "text",
+    ".dockerfile": "dockerfile",
+    ".makefile": "makefile",
+    ".r": "r",
+    ".R": "r",
+    ".m": "matlab",
+    ".pl": "perl",
+    ".vim": "vim",
+}
+
+
+@lru_cache(maxsize=1024)
 def get_file_language(file_path: str) -> str:
     """Detect programming language from file extension"""
-    ext = os.path.splitext(file_path)[1].lower()
-    language_map = {
-        ".py": "python",
-        ".js": "javascript",
-        ".ts": "typescript",
-        ".jsx": "jsx",
-        ".tsx": "tsx",
-        ".java": "java",
-        ".cpp": "cpp",
-        ".c": "c",
-        ".h": "c",
-        ".cs": "csharp",
-        ".php": "php",
-        ".rb": "ruby",
-        ".go": "go",
-        ".rs": "rust",
-        ".swift": "swift",
-        ".kt": "kotlin",
-        ".scala": "scala",
-        ".sh": "bash",
-        ".bash": "bash",
-        ".zsh": "bash",
-        ".fish": "fish",
-        ".ps1": "powershell",
-        ".html": "html",
-        ".htm": "html",
-        ".xml": "xml",
-        ".css": "css",
-        ".scss": "scss",
-        ".sass": "sass",
-        ".less": "less",
-        ".json": "json",
-        ".yaml": "yaml",
-        ".yml": "yaml",
-        ".toml": "toml",
-        ".ini": "ini",
-        ".cfg": "ini",
-        ".conf": "ini",
-        ".sql": "sql",
-        ".md": "markdown",
-        ".markdown": "markdown",
-        ".rst": "rst",
-        ".txt": "text",
-        ".log": "text",
-        ".dockerfile": "dockerfile",
-        ".makefile": "makefile",
-        ".r": "r",
-        ".R": "r",
-        ".m": "matlab",
-        ".pl": "perl",
-        ".vim": "vim",
-    }
-    return language_map.get(ext, "text")
+    # rfind + slice instead of splitext; a suffix with a separator just misses the map
+    i = file_path.rfind(".")
+    if i <= 0 or file_path[i - 1] in "/\\":
+        return "text"  # No extension, or a dotfile such as .bashrc
+    return _LANGUAGE_MAP.get(file_path[i:].lower(), "text")
+
+
+# Directories larger than this stat their entries on a thread pool
+_PARALLEL_STAT_THRESHOLD = 64
+_stat_pool: Optional[ThreadPoolExecutor] = None
+
+
+def _stat_entry(entry: os.DirEntry) -> Optional[os.stat_result]:
+    """stat() a directory entry, following symlinks; None if it fails"""
+    try:
+        return entry.stat()
+    except OSError:
+        return None
+
+
+def _stat_entries(entries: List[os.DirEntry]) -> List[Optional[os.stat_result]]:
+    """stat() many entries, overlapping the syscalls for large directories"""
+    global _stat_pool
+    if len(entries) <= _PARALLEL_STAT_THRESHOLD:
+        return [_stat_entry(entry) for entry in entries]
+    # stat releases the GIL, so slow (network) filesystems answer in parallel
+    if _stat_pool is None:
+        _stat_pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix="stat")
+    return list(_stat_pool.map(_stat_entry, entries))
+
+
+# Byte counts for the display size units
+_KB = 1 << 10
+_MB = 1 << 20
+
+
+def _format_size(size: int) -> str:
+    """Human-readable size with one decimal, using integer arithmetic only"""
+    if size > _MB:
+        unit, suffix = _MB, "MB"
+    elif size > _KB:
+        unit, suffix = _KB, "KB"
+    else:
+        return f"{size} B"
+    tenths = (size * 10 + unit // 2) // unit
+    return f"{tenths // 10}.{tenths % 10} {suffix}"
 
 
 def execute_get_files_info(
@@ -77,32 +132,29 @@ def execute_get_files_info(
         rich_print(f"  📂 Listing files in: {directory}", style="dim")
 
     try:
-        files = os.listdir(directory)
-        file_info = []
-        files_data = []
-
-        for file in sorted(files):
-            full_path = os.path.join(directory, file)
-            try:
-                size = os.path.getsize(full_path)
-                is_dir = os.path.isdir(full_path)
-                file_type = "directory" if is_dir else "file"
-
-                # For AI context
-                file_info.append(f"{file} ({file_type}, {size} bytes)")
-
-                # For display
-                if size > 1024 * 1024:
-                    size_str = f"{size/(1024*1024):.1f} MB"
-                elif size > 1024:
-                    size_str = f"{size/1024:.1f} KB"
-                else:
-                    size_str = f"{size} B"
-                files_data.append((file, file_type, size_str))
-
-            except:
-                file_info.append(f"{file} (unknown)")
-                files_data.append((file, "unknown", "unknown"))
+        # One scandir pass; types and sizes come from each entry's stat
+        with os.scandir(directory) as it:
+            entries = sorted(it, key=lambda entry: entry.name)
+        # Entry count is known up front, so fill fixed-size lists by index
+        count = len(entries)
+        file_info = [None] * count
+        files_data = [None] * count
+
+        for i, (entry, st) in enumerate(zip(entries, _stat_entries(entries))):
+            file = entry.name
+            if st is None:
+                file_info[i] = f"{file} (unknown)"
+                files_data[i] = (file, "unknown", "unknown")
+                continue
+
+            size = st.st_size
+            file_type = "directory" if stat.S_ISDIR(st.st_mode) else "file"
+
+            # For AI context
+            file_info[i] = f"{file} ({file_type}, {size} bytes)"
+
+            # For display
+            files_data[i] = (file, file_type, _format_size(size))
 
         ai_result = f"Files in '{directory}':\n" + "\n".join(file_info)
         user_result = f"📁 Files in '{directory}'"
@@ -117,6 +169,84 @@ def execute_get_files_info(
         return error_msg, error_msg, []
 
 
+# Characters of a file sent to the model, and the most bytes ever read for display
+_AI_CONTENT_CHARS = 2000
+_DISPLAY_CONTENT_BYTES = 100_000
+# O_BINARY only exists on Windows, where it stops os.read translating newlines
+_READ_FLAGS = os.O_RDONLY | getattr(os, "O_BINARY", 0)
+
+
+def _read_head(file_path: str, limit: int) -> Tuple[bytes, os.stat_result]:
+    """Read up to limit bytes with raw os calls, returning them and the file's stat"""
+    fd = os.open(file_path, _READ_FLAGS)
+    try:
+        st = os.fstat(fd)
+        raw = os.read(fd, limit)
+        # Regular files fill the read at once; loop for pipes and /proc-style files
+        if raw and len(raw) < limit and len(raw) != st.st_size:
+            chunks = [raw]
+            remaining = limit - len(raw)
+            while remaining:
+                chunk = os.read(fd, remaining)
+                if not chunk:
+                    break
+                chunks.append(chunk)
+                remaining -= len(chunk)
+            raw = b"".join(chunks)
+        return raw, st
+    finally:
+        os.close(fd)
+
+
+# Decoded files kept in memory, keyed by (st_dev, st_ino); at most ~3 MB in total
+_CONTENT_CACHE_SIZE = 32
+_content_cache: "OrderedDict[Tuple[int, int], tuple]" = OrderedDict()
+
+
+def _load_text(file_path: str) -> Tuple[str, bool, str]:
+    """Decoded content, truncation flag and size note, reused while the file is unchanged"""
+    # Always re-stat: a hit needs the same mtime and size as when it was cached
+    st = os.stat(file_path)
+    key = (st.st_dev, st.st_ino)
+    cached = _content_cache.get(key)
+    if cached is not None and cached[0] == st.st_mtime_ns and cached[1] == st.st_size:
+        _content_cache.move_to_end(key)
+        return cached[2]
+
+    # Bounded raw read decoded in one call, skipping the buffered/text layers
+    raw, st = _read_head(file_path, _DISPLAY_CONTENT_BYTES + 1)
+    truncated = len(raw) > _DISPLAY_CONTENT_BYTES
+    if truncated:
+        size_note = f"{st.st_size} bytes"
+        # The limit may split a multi-byte character; drop its partial bytes
+        content = codecs.getincrementaldecoder("utf-8")().decode(
+            raw[:_DISPLAY_CONTENT_BYTES], final=False
+        )
+    else:
+        content = raw.decode("utf-8")
+        size_note = f"{len(content)} chars"
+    if "\r" in content:
+        # Universal newlines, as text mode did: CRLF, then any lone CR
+        content = content.replace("\r\n", "\n").replace("\r", "\n")
+
+    result = (content, truncated, size_note)
+    # Only cache files whose stat describes what was read (not /proc or pipes)
+    if stat.S_ISREG(st.st_mode) and (truncated or len(raw) == st.st_size):
+        _content_cache[(st.st_dev, st.st_ino)] = (st.st_mtime_ns, st.st_size, result)
+        if len(_content_cache) > _CONTENT_CACHE_SIZE:
+            _content_cache.popitem(last=False)
+    return result
+
+
+def _forget_content(file_path: str) -> None:
+    """Drop a file's cached content, for filesystems with coarse mtimes"""
+    try:
+        st = os.stat(file_path)
+    except OSError:
+        return
+    _content_cache.pop((st.st_dev, st.st_ino), None)
+
+
 def execute_get_file_content(arguments: Dict, verbose: bool = False) -> Tuple[str, str]:
     """Read file content"""
     file_path = arguments.get("file_path")
@@ -128,25 +258,26 @@ def execute_get_file_content(arguments: Dict, verbose: bool = False) -> Tuple[st
         rich_print(f"  📖 Reading file: {file_path}", style="dim")
 
     try:
-        with open(file_path, "r", encoding="utf-8") as f:
-            content = f.read()
-
-            # AI gets limited but sufficient content
-            if len(content) > 2000:
-                ai_content = (
-                    content[:2000]
-                    + f"\n[Note: This file has {len(content)} total characters. The above excerpt should be sufficient to answer most questions about this file.]"
-                )
-            else:
-                ai_content = content
+        content, truncated, size_note = _load_text(file_path)
+
+        # AI gets limited but sufficient content
+        if len(content) > _AI_CONTENT_CHARS:
+            ai_content = (
+                content[:_AI_CONTENT_CHARS]
+                + f"\n[Note: This file has {size_note} in total. The above excerpt should be sufficient to answer most questions about this file.]"
+            )
+        else:
+            ai_content = content
 
-            ai_result = f"Content of '{file_path}':\n{ai_content}"
+        ai_result = f"Content of '{file_path}':\n{ai_content}"
 
-            # User display format
-            language = get_file_language(file_path)
-            user_result = f"📄 {file_path} ({language}, {len(content)} chars):{content}"
+        # User display format
+        language = get_file_language(file_path)
+        user_result = f"📄 {file_path} ({language}, {size_note}):{content}"
+        if truncated:
+            user_result += f"\n... [truncated - showing first {_DISPLAY_CONTENT_BYTES} bytes]"
 
-            return ai_result, user_result
+        return ai_result, user_result
 
     except FileNotFoundError:
         error_msg = f"❌ Error: File '{file_path}' not found"
@@ -161,6 +292,36 @@ def execute_get_file_content(arguments: Dict, verbose: bool = False) -> Tuple[st
         return error_msg, error_msg
 
 
+# Most files a single batch_read call may return, to bound the context it adds
+_BATCH_READ_MAX_FILES = 10
+
+
+def execute_batch_read(arguments: Dict, verbose: bool = False) -> Tuple[str, str]:
+    """Read several files in one call"""
+    file_paths = arguments.get("file_paths")
+    if not file_paths or not isinstance(file_paths, list):
+        error_msg = "❌ Error: file_paths parameter required (a list of paths)"
+        return error_msg, error_msg
+    if len(file_paths) > _BATCH_READ_MAX_FILES:
+        error_msg = f"❌ Error: Too many files for batch_read (max: {_BATCH_READ_MAX_FILES})"
+        return error_msg, error_msg
+
+    ai_parts = []
+    user_parts = []
+    # Reads share the content cache, so they run in order on this thread
+    for file_path in file_paths:
+        try:
+            ai_result, user_result = execute_get_file_content(
+                {"file_path": file_path}, verbose
+            )
+        except Exception as e:
+            ai_result = user_result = f"❌ Error reading '{file_path}': {str(e)}"
+        ai_parts.append(ai_result)
+        user_parts.append(user_result)
+
+    return "\n\n".join(ai_parts), "\n\n".join(user_parts)
+
+
 def execute_write_file(arguments: Dict, verbose: bool = False) -> Tuple[str, str]:
     """Write content to file"""
     file_path = arguments.get("file_path")
@@ -174,8 +335,11 @@ def execute_write_file(arguments: Dict, verbose: bool = False) -> Tuple[str, str
         rich_print(f"  ✍️  Writing to file: {file_path}", style="dim")
 
     try:
-        with open(file_path, "w", encoding="utf-8") as f:
-            f.write(content)
+        # Encode once and hand the bytes to a single write, skipping the text layer
+        data = content if os.linesep == "\n" else content.replace("\n", os.linesep)
+        with open(file_path, "wb") as f:
+            f.write(data.encode("utf-8"))
+        _forget_content(file_path)
         result = f"✅ Successfully wrote {len(content)} characters to '{file_path}'"
         return result, result
     except PermissionError:
@@ -186,6 +350,48 @@ def execute_write_file(arguments: Dict, verbose: bool = False) -> Tuple[str, str
         return error_msg, error_msg
 
 
+# Most bytes of each output stream decoded and returned from a subprocess
+_MAX_OUTPUT_BYTES = 65536
+
+
+def _decode_output(raw: bytes) -> str:
+    """Decode captured subprocess bytes once, capped at _MAX_OUTPUT_BYTES"""
+    text = raw[:_MAX_OUTPUT_BYTES].decode("utf-8", errors="replace")
+    if "\r" in text:
+        # Universal newlines, as text mode did: CRLF, then any lone CR
+        text = text.replace("\r\n", "\n").replace("\r", "\n")
+    if len(raw) > _MAX_OUTPUT_BYTES:
+        text += f"\n... [truncated - {len(raw)} bytes of output]"
+    return text
+
+
+def _run_captured(
+    cmd: List[str], timeout: float, executable: Optional[str] = None, strip: bool = False
+) -> Tuple[str, str, int]:
+    """Run a command and return its decoded stdout, stderr and exit code"""
+    # Leave preexec_fn/user/group/extra_groups unset: any of them makes CPython
+    # fall back from vfork to a full fork. close_fds stays True (which rules out
+    # posix_spawn before 3.13) so the pooled HTTP socket never leaks into children.
+    with subprocess.Popen(
+        cmd,
+        executable=executable,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        shell=False,  # NEVER use shell=True for security
+    ) as process:
+        try:
+            stdout, stderr = process.communicate(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.communicate()
+            raise
+    if strip:
+        # Trim the raw bytes so the decode never sees the surrounding whitespace
+        stdout = stdout.strip()
+        stderr = stderr.strip()
+    return _decode_output(stdout), _decode_output(stderr), process.returncode
+
+
 def execute_run_python_file(arguments: Dict, verbose: bool = False) -> Tuple[str, str]:
     """Run Python script"""
     file_path = arguments.get("file_path")
@@ -203,16 +409,15 @@ def execute_run_python_file(arguments: Dict, verbose: bool = False) -> Tuple[str
     try:
         cmd = [sys.executable, file_path] + args
 
-        result = subprocess.run(
-            cmd, capture_output=True, text=True, timeout=30, cwd=os.getcwd()
-        )
+        stdout, stderr, returncode = _run_captured(cmd, timeout=30)
 
-        output = ""
-        if result.stdout:
-            output += f"📤 STDOUT:\n{result.stdout}\n"
-        if result.stderr:
-            output += f"🚨 STDERR:\n{result.stderr}\n"
-        output += f"🔢 Return code: {result.returncode}"
+        parts = []
+        if stdout:
+            parts.append(f"📤 STDOUT:\n{stdout}")
+        if stderr:
+            parts.append(f"🚨 STDERR:\n{stderr}")
+        parts.append(f"🔢 Return code: {returncode}")
+        output = "\n".join(parts)
 
         return output, output
 
@@ -227,6 +432,95 @@ def execute_run_python_file(arguments: Dict, verbose: bool = False) -> Tuple[str
         return error_msg, error_msg
 
 
+# Absolute paths found for whitelisted commands; misses are never stored, so a
+# tool installed mid-session is picked up on its next use
+_resolved_commands: Dict[str, str] = {}
+
+
+def _resolve_command(name: str) -> str:
+    """Absolute path of a whitelisted command, so PATH is searched only once"""
+    path = _resolved_commands.get(name)
+    if path is None:
+        path = shutil.which(name)
+        if path is None:
+            return name
+        # A relative PATH entry gives a relative hit, which /cd would invalidate
+        if os.path.isabs(path):
+            _resolved_commands[name] = path
+    return path
+
+
+# Ultra-conservative whitelist - start very small
+_SAFE_COMMANDS = {
+    'mkdir': {
+        'command': 'mkdir',
+        'description': 'Create directory',
+        'max_args': 2,  # mkdir -p dirname
+    },
+    'touch': {
+        'command': 'touch', 
+        'description': 'Create empty file',
+        'max_args': 1,
+    },
+    'ls': {
+        'command': 'ls',
+        'description': 'List directory contents', 
+        'max_args': 2,  # ls -la dirname
+    },
+    'pwd': {
+        'command': 'pwd',
+        'description': 'Show current directory',
+        'max_args': 0,
+    },
+    'echo': {
+        'command': 'echo',
+        'description': 'Print text',
+        'max_args': 10,
+    }
+}
+
+# Windows equivalents
+if platform.system().lower() == "windows":
+    _SAFE_COMMANDS.update({
+        'dir': {
+            'command': 'dir',
+            'description': 'List directory contents (Windows)',
+            'max_args': 1,
+        },
+        'md': {
+            'command': 'md', 
+            'description': 'Create directory (Windows)',
+            'max_args': 1,
+        }
+    })
+
+# Listed in the error for commands outside the whitelist
+_AVAILABLE_COMMANDS = ", ".join(_SAFE_COMMANDS)
+
+# Argument substrings blocked for shell commands
+_DANGEROUS_PATTERNS = (
+    '..',      # Path traversal
+    ';',       # Command chaining
+    '&&',      # Command chaining
+    '||',      # Command chaining
+    '|',       # Piping
+    '>',       # Redirection
+    '<',       # Redirection
+    '`',       # Command substitution
+    '$(',      # Command substitution
+    '${',      # Variable expansion
+    '~/',      # Home directory (force explicit paths)
+    '\\',      # Windows path separators (use forward slash)
+)
+# One scan per argument; longer alternatives come first so '||' wins over '|'
+_DANGEROUS_RE = re.compile("|".join(map(re.escape, _DANGEROUS_PATTERNS)))
+
+# Commands whose arguments are paths, flags they may take, and absolute path starts
+_PATH_COMMANDS = frozenset(('mkdir', 'touch', 'md'))
+_HARMLESS_FLAGS = frozenset(('-p', '-v'))
+_ABS_PATH_PREFIXES = ('/', 'C:', 'D:')
+
+
 def execute_shell_command(arguments: Dict, verbose: bool = False) -> Tuple[str, str]:
     """Execute safe shell commands with strict security controls"""
     command = arguments.get("command")
@@ -236,67 +530,30 @@ def execute_shell_command(arguments: Dict, verbose: bool = False) -> Tuple[str,
         error_msg = "❌ Error: command parameter required"
         return error_msg, error_msg
 
-    # Ultra-conservative whitelist - start very small
-    SAFE_COMMANDS = {
-        'mkdir': {
-            'command': 'mkdir',
-            'description': 'Create directory',
-            'max_args': 2,  # mkdir -p dirname
-        },
-        'touch': {
-            'command': 'touch', 
-            'description': 'Create empty file',
-            'max_args': 1,
-        },
-        'ls': {
-            'command': 'ls',
-            'description': 'List directory contents', 
-            'max_args': 2,  # ls -la dirname
-        },
-        'pwd': {
-            'command': 'pwd',
-            'description': 'Show current directory',
-            'max_args': 0,
-        },
-        'echo': {
-            'command': 'echo',
-            'description': 'Print text',
-            'max_args': 10,
-        }
-    }
-    
-    # Windows equivalents
-    if platform.system().lower() == "windows":
-        SAFE_COMMANDS.update({
-            'dir': {
-                'command': 'dir',
-                'description': 'List directory contents (Windows)',
-                'max_args': 1,
-            },
-            'md': {
-                'command': 'md', 
-                'description': 'Create directory (Windows)',
-                'max_args': 1,
-            }
-        })
-
     if verbose:
         rich_print(f"  🖥️  Requested shell command: {command} {args}", style="dim")
 
     # Check if command is in whitelist
-    if command not in SAFE_COMMANDS:
-        error_msg = f"❌ Error: Command '{command}' not in safe whitelist"
-        available = ", ".join(SAFE_COMMANDS.keys())
-        error_msg += f"\n💡 Available commands: {available}"
+    cmd_info = _SAFE_COMMANDS.get(command)
+    if cmd_info is None:
+        error_msg = (
+            f"❌ Error: Command '{command}' not in safe whitelist"
+            f"\n💡 Available commands: {_AVAILABLE_COMMANDS}"
+        )
         return error_msg, error_msg
-
-    cmd_info = SAFE_COMMANDS[command]
     
     # Check argument count
     if len(args) > cmd_info['max_args']:
         error_msg = f"❌ Error: Too many arguments for '{command}' (max: {cmd_info['max_args']})"
         return error_msg, error_msg
 
+    # Path arguments must stay inside the working directory; look it up once
+    checks_paths = command in _PATH_COMMANDS
+    if checks_paths:
+        current_dir = os.getcwd()
+        # Trailing separator so /tmp/foo does not count as inside /tmp/fo
+        current_prefix = os.path.join(current_dir, "")
+
     # Security validation for arguments
     for arg in args:
         if not isinstance(arg, str):
@@ -304,39 +561,25 @@ def execute_shell_command(arguments: Dict, verbose: bool = False) -> Tuple[str,
             return error_msg, error_msg
             
         # Block dangerous patterns
-        dangerous_patterns = [
-            '..',      # Path traversal
-            ';',       # Command chaining
-            '&&',      # Command chaining
-            '||',      # Command chaining  
-            '|',       # Piping
-            '>',       # Redirection
-            '<',       # Redirection
-            '`',       # Command substitution
-            '$(',      # Command substitution
-            '${',      # Variable expansion
-            '~/',      # Home directory (force explicit paths)
-            '\\',      # Windows path separators (use forward slash)
-        ]
-        
-        for pattern in dangerous_patterns:
-            if pattern in arg:
-                error_msg = f"❌ Error: Dangerous pattern '{pattern}' detected in argument: {arg}"
-                return error_msg, error_msg
+        match = _DANGEROUS_RE.search(arg)
+        if match:
+            error_msg = f"❌ Error: Dangerous pattern '{match.group(0)}' detected in argument: {arg}"
+            return error_msg, error_msg
         
         # Additional path safety for file/directory operations
-        if command in ['mkdir', 'touch', 'md'] and arg not in ['-p', '-v']:
+        if checks_paths and arg not in _HARMLESS_FLAGS:
             # Must be relative path in current directory or subdirectory
-            if arg.startswith('/') or arg.startswith('C:') or arg.startswith('D:'):
-                error_msg = f"❌ Error: Absolute paths not allowed: {arg}"
-                error_msg += f"\n💡 Use relative paths like 'dirname' or 'subdir/filename'"
+            if arg.startswith(_ABS_PATH_PREFIXES):
+                error_msg = (
+                    f"❌ Error: Absolute paths not allowed: {arg}"
+                    "\n💡 Use relative paths like 'dirname' or 'subdir/filename'"
+                )
                 return error_msg, error_msg
                 
             # Check if path would escape current directory
             try:
-                resolved_path = os.path.abspath(arg)
-                current_dir = os.getcwd()
-                if not resolved_path.startswith(current_dir):
+                resolved_path = os.path.normpath(os.path.join(current_dir, arg))
+                if resolved_path != current_dir and not resolved_path.startswith(current_prefix):
                     error_msg = f"❌ Error: Path escapes current directory: {arg}"
                     return error_msg, error_msg
             except Exception:
@@ -350,29 +593,29 @@ def execute_shell_command(arguments: Dict, verbose: bool = False) -> Tuple[str,
         if verbose:
             rich_print(f"  ✅ Executing safe command: {' '.join(cmd_list)}", style="dim")
         
-        # Execute with strict timeout and security
-        result = subprocess.run(
+        # Execute with strict timeout and security; the absolute executable
+        # keeps PATH lookup out of the launch
+        stdout, stderr, returncode = _run_captured(
             cmd_list,
-            capture_output=True,
-            text=True,
             timeout=10,  # 10 second timeout
-            cwd=os.getcwd(),  # Explicitly set working directory
-            shell=False,  # NEVER use shell=True for security
+            executable=_resolve_command(cmd_info['command']),
+            strip=True,
         )
         
-        output = ""
-        if result.stdout:
-            output += f"📤 Output:\n{result.stdout.strip()}\n"
-        if result.stderr:
-            output += f"🚨 Error:\n{result.stderr.strip()}\n"
-        output += f"🔢 Exit code: {result.returncode}"
+        parts = []
+        if stdout:
+            parts.append(f"📤 Output:\n{stdout}")
+        if stderr:
+            parts.append(f"🚨 Error:\n{stderr}")
+        parts.append(f"🔢 Exit code: {returncode}")
+        output = "\n".join(parts)
         
-        if result.returncode == 0:
+        if returncode == 0:
             success_msg = f"✅ Command executed successfully: {command}"
-            if result.stdout.strip():
-                success_msg += f"\n{result.stdout.strip()}"
+            if stdout:
+                success_msg += f"\n{stdout}"
         else:
-            success_msg = f"⚠️  Command completed with exit code {result.returncode}"
+            success_msg = f"⚠️  Command completed with exit code {returncode}"
         
         return output, success_msg
 
@@ -391,39 +634,62 @@ def execute_shell_command(arguments: Dict, verbose: bool = False) -> Tuple[str,
 FUNCTION_HANDLERS = {
     "get_files_info": execute_get_files_info,
     "get_file_content": execute_get_file_content,
+    "batch_read": execute_batch_read,
     "write_file": execute_write_file,
     "run_python_file": execute_run_python_file,
     "shell_command": execute_shell_command,
 }
 
 
+def _make_dispatcher(function_name: str, handler: Callable, config=None) -> Callable:
+    """Specialize a handler once so each call skips the per-name checks"""
+    returns_data = function_name == "get_files_info"
+    checks_shell = function_name == "shell_command" and config is not None
+
+    def dispatch(arguments: Dict, verbose: bool = False) -> Tuple[str, str, any]:
+        # Shell commands can be switched off at runtime, so this stays a live check
+        if checks_shell and not getattr(config, "shell_commands_enabled", True):
+            error_msg = "❌ Error: Shell commands are disabled. Use /shellcmds on to enable."
+            return error_msg, error_msg, None
+
+        try:
+            result = handler(arguments, verbose)
+        except Exception as e:
+            error_msg = f"❌ Error executing {function_name}: {str(e)}"
+            return error_msg, error_msg, None
+
+        # Only get_files_info returns extra display data
+        if returns_data:
+            return result
+        ai_result, user_result = result
+        return ai_result, user_result, None
+
+    return dispatch
+
+
+def build_function_dispatch(config=None) -> Dict[str, Callable]:
+    """Build a name -> dispatcher table bound to the given config"""
+    return {
+        name: _make_dispatcher(name, handler, config)
+        for name, handler in FUNCTION_HANDLERS.items()
+    }
+
+
+# Dispatchers for callers without a config, specialized once at import
+_DEFAULT_DISPATCH = build_function_dispatch()
+
+
 def execute_function(
     function_name: str, arguments: Dict, verbose: bool = False, config=None
 ) -> Tuple[str, str, any]:
     """Execute a function and return results"""
-    if function_name not in FUNCTION_HANDLERS:
+    if config is None:
+        dispatch = _DEFAULT_DISPATCH.get(function_name)
+    else:
+        handler = FUNCTION_HANDLERS.get(function_name)
+        dispatch = handler and _make_dispatcher(function_name, handler, config)
+    if dispatch is None:
         error_msg = f"❌ Error: Unknown function '{function_name}'"
         return error_msg, error_msg, None
 
-    try:
-        handler = FUNCTION_HANDLERS[function_name]
-        
-        # Special handling for shell commands to check if enabled
-        if function_name == "shell_command":
-            if config and hasattr(config, 'shell_commands_enabled') and not config.shell_commands_enabled:
-                error_msg = "❌ Error: Shell commands are disabled. Use /shellcmds on to enable."
-                return error_msg, error_msg, None
-        
-        result = handler(arguments, verbose)
-
-        # Handle different return formats
-        if function_name == "get_files_info":
-            ai_result, user_result, files_data = result
-            return ai_result, user_result, files_data
-        else:
-            ai_result, user_result = result
-            return ai_result, user_result, None
-
-    except Exception as e:
-        error_msg = f"❌ Error executing {function_name}: {str(e)}"
-        return error_msg, error_msg, None
\ No newline at end of file
+    return dispatch(arguments, verbose)
@@ -4,22 +4,24 @@ Dynamic prompt management system with file-based prompts
 
 import os
 import re
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, List, Tuple
+from typing import Dict, Set, Tuple
 from utils.display import rich_print
 
+# Markdown patterns stripped from prompt files, compiled once at import
+_RE_BOLD = re.compile(r'\*\*(.*?)\*\*')
+_RE_ITALIC = re.compile(r'\*(.*?)\*')
+_RE_RULE = re.compile(r'-{3,}\s*')
+_RE_BLANKS = re.compile(r'\n\s*\n\s*\n')
+
+# Divider around prompt previews
+_PREVIEW_RULE = "-" * 40
 
-class PromptManager:
-    """Manages system prompts from files and built-in defaults"""
-    
-    def __init__(self, prompts_dir: str = "prompts"):
-        self.prompts_dir = Path(prompts_dir)
-        self.builtin_prompts = self._get_builtin_prompts()
-        
-    def _get_builtin_prompts(self) -> Dict[str, str]:
-        """Built-in default prompts"""
-        return {
-            "default": """You are a helpful AI coding assistant with access to file system operations.
+
+# Built-in default prompts, shared by every PromptManager
+_BUILTIN_PROMPTS = {
+    "default": """You are a helpful AI coding assistant with access to file system operations.
 
 You can help with various tasks including:
 - Answering questions about code and programming
@@ -43,6 +45,7 @@ When you need to work with files or directories, you can call these functions by
 Available functions:
 - get_files_info: List files in a directory. Parameters: {"directory": "path"}
 - get_file_content: Read file content. Parameters: {"file_path": "path"}  
+- batch_read: Read several files in one call. Parameters: {"file_paths": ["path1", "path2"]}
 - write_file: Write content to a file. Parameters: {"file_path": "path", "content": "text"}
 - run_python_file: Execute a Python script. Parameters: {"file_path": "path", "args": ["arg1", "arg2"]}
 - shell_command: Execute safe shell commands. Parameters: {"command": "mkdir", "args": ["dirname"]}
@@ -58,7 +61,7 @@ Important notes:
 
 Feel free to have normal conversations and provide help without always needing to call functions. Use functions only when the task actually requires file operations or shell commands.""",
 
-            "senior_dev": """You are a senior software engineer and coding mentor with deep expertise across multiple programming languages and paradigms.
+    "senior_dev": """You are a senior software engineer and coding mentor with deep expertise across multiple programming languages and paradigms.
 
 Your role:
 - Provide expert-level code reviews and architectural guidance
@@ -70,6 +73,7 @@ Your role:
 When working with files, use these functions as needed:
 - get_files_info: List directory contents
 - get_file_content: Read source files  
+- batch_read: Read several related files in one call
 - write_file: Create well-structured code files
 - run_python_file: Test and validate scripts
 - shell_command: Use mkdir, touch, ls for file operations
@@ -84,7 +88,7 @@ Code standards you follow:
 
 Only use functions when actually needed for file operations. Provide thoughtful explanations and mentorship in your responses.""",
 
-            "project_architect": """You are a technical project architect focused on large-scale software design and implementation.
+    "project_architect": """You are a technical project architect focused on large-scale software design and implementation.
 
 Your expertise includes:
 - System architecture and design patterns
@@ -97,6 +101,7 @@ Your expertise includes:
 Available functions for project management:
 - get_files_info: Analyze project structure
 - get_file_content: Review implementation files
+- batch_read: Read several related files in one call
 - write_file: Create architectural documents, configs, and boilerplate
 - run_python_file: Test system components
 - shell_command: Create directory structures and organize projects
@@ -111,7 +116,7 @@ Your approach:
 
 Focus on high-level design decisions while being hands-on with implementation when needed.""",
 
-            "debugging_expert": """You are a debugging and troubleshooting specialist with exceptional problem-solving skills.
+    "debugging_expert": """You are a debugging and troubleshooting specialist with exceptional problem-solving skills.
 
 Your mission:
 - Identify root causes of bugs and issues
@@ -124,6 +129,7 @@ Your mission:
 Tools at your disposal:
 - get_files_info: Explore project structure for context
 - get_file_content: Examine problematic code files
+- batch_read: Read several related files in one call
 - write_file: Create fixed versions, tests, or debugging utilities
 - run_python_file: Test fixes and reproduce issues
 - shell_command: Create test environments and organize debugging files
@@ -138,7 +144,7 @@ Your methodology:
 
 Be thorough, methodical, and educational in your debugging approach.""",
 
-            "code_reviewer": """You are a meticulous code reviewer focused on quality, security, and maintainability.
+    "code_reviewer": """You are a meticulous code reviewer focused on quality, security, and maintainability.
 
 Your review criteria:
 - Code correctness and logic
@@ -152,6 +158,7 @@ Your review criteria:
 Review process tools:
 - get_files_info: Understand project context
 - get_file_content: Examine code for review
+- batch_read: Read several related files in one call
 - write_file: Suggest improvements or create examples
 - run_python_file: Validate functionality
 - shell_command: Organize review files and test environments
@@ -166,7 +173,7 @@ Your feedback style:
 
 Always explain the reasoning behind your recommendations and offer alternatives when appropriate.""",
 
-            "rapid_prototyper": """You are a rapid prototyping specialist focused on quick iteration and proof-of-concept development.
+    "rapid_prototyper": """You are a rapid prototyping specialist focused on quick iteration and proof-of-concept development.
 
 Your strengths:
 - Fast implementation of ideas and concepts
@@ -179,6 +186,7 @@ Your strengths:
 Prototyping toolkit:
 - get_files_info: Survey existing components
 - get_file_content: Understand current implementations
+- batch_read: Read several related files in one call
 - write_file: Create quick prototypes and POCs
 - run_python_file: Test ideas immediately
 - shell_command: Rapidly set up project structures
@@ -192,10 +200,61 @@ Your approach:
 - Plan for future refinement
 
 Perfect for hackathons, experiments, and initial concept validation. You balance speed with just enough structure to make prototypes useful and extensible."""
-        }
+}
+
+# One-line descriptions of the built-in prompts
+_PROMPT_DESCRIPTIONS = {
+    "default": "Balanced coding assistant for general programming tasks",
+    "senior_dev": "Expert-level mentor focusing on best practices and code quality",
+    "project_architect": "Large-scale system design and project architecture",
+    "debugging_expert": "Specialized in troubleshooting and problem-solving",
+    "code_reviewer": "Meticulous code quality and security review",
+    "rapid_prototyper": "Fast iteration and proof-of-concept development",
+}
+
+
+@lru_cache(maxsize=128)
+def _prompt_path(prompts_dir: str, name: str) -> str:
+    """Path of a prompt's markdown file, joined once per directory and name"""
+    return os.path.join(prompts_dir, f"{name}.md")
+
+
+@lru_cache(maxsize=None)
+def _export_header(name: str) -> str:
+    """Metadata header written above an exported prompt"""
+    description = _PROMPT_DESCRIPTIONS.get(name, "Custom system prompt")
+    return f"""# {name.replace('_', ' ').title()} Prompt
+
+**Type:** System Prompt  
+**Usage:** `/prompt {name}`  
+**Description:** {description}
+
+---
 
+"""
+
+
+class PromptManager:
+    """Manages system prompts from files and built-in defaults"""
+
+    def __init__(self, prompts_dir: str = "prompts"):
+        self.prompts_dir = Path(prompts_dir)
+        # Absolute prompt directories already known to exist
+        self._checked_dirs: Set[str] = set()
+        # Per-instance copy, so adding or editing a builtin can't leak elsewhere
+        self.builtin_prompts = dict(_BUILTIN_PROMPTS)
+        # list_available_prompts() result, valid while the directory mtime is unchanged
+        self._prompts_cache: Dict[str, Dict] = {}
+        self._prompts_cache_mtime = -1
+        # name -> (file mtime, stripped content) for prompts loaded from files
+        self._content_cache: Dict[str, Tuple[int, str]] = {}
+        
     def ensure_prompts_directory(self) -> bool:
         """Create prompts directory and export built-in prompts if it doesn't exist"""
+        # Keyed by absolute path, since a relative prompts dir moves with /cd
+        dir_key = os.path.abspath(self.prompts_dir)
+        if dir_key in self._checked_dirs:
+            return False
         try:
             if not self.prompts_dir.exists():
                 self.prompts_dir.mkdir(parents=True, exist_ok=True)
@@ -203,7 +262,9 @@ Perfect for hackathons, experiments, and initial concept validation. You balance
                 
                 # Export built-in prompts to files
                 self.export_builtin_prompts()
+                self._checked_dirs.add(dir_key)
                 return True
+            self._checked_dirs.add(dir_key)
             return False
         except Exception as e:
             rich_print(f"❌ Error creating prompts directory: {e}", style="red")
@@ -252,6 +313,7 @@ You can use markdown for documentation, but the AI receives the content as plain
 The AI has access to these functions:
 - `get_files_info` - List directory contents
 - `get_file_content` - Read files
+- `batch_read` - Read several files in one call
 - `write_file` - Create/modify files  
 - `run_python_file` - Execute Python scripts
 - `shell_command` - Safe shell commands (mkdir, touch, ls, pwd, echo)
@@ -259,36 +321,29 @@ The AI has access to these functions:
 When shell commands are enabled, additional instructions are automatically appended.
 """
         
-        readme_path = self.prompts_dir / "README.md"
+        readme_path = os.path.join(self.prompts_dir, "README.md")
         try:
-            with open(readme_path, 'w', encoding='utf-8') as f:
-                f.write(readme_content)
+            self._write_text(readme_path, readme_content)
             rich_print(f"📄 Created README.md in prompts directory", style="green")
         except Exception as e:
             rich_print(f"❌ Error creating README: {e}", style="red")
 
     def _write_prompt_file(self, name: str, content: str, is_export: bool = False) -> bool:
         """Write prompt content to a markdown file"""
-        file_path = self.prompts_dir / f"{name}.md"
+        file_path = _prompt_path(str(self.prompts_dir), name)
         
         try:
             # Add metadata header for exported prompts
             if is_export:
-                header = f"""# {name.replace('_', ' ').title()} Prompt
-
-**Type:** System Prompt  
-**Usage:** `/prompt {name}`  
-**Description:** {self._get_prompt_description(name)}
-
----
-
-"""
-                full_content = header + content
+                full_content = _export_header(name) + content
             else:
                 full_content = content
                 
-            with open(file_path, 'w', encoding='utf-8') as f:
-                f.write(full_content)
+            # Leave identical files alone so their mtime (and cached content) stays valid
+            if not self._file_has_content(file_path, full_content):
+                self._write_text(file_path, full_content)
+                self._prompts_cache_mtime = -1
+                self._content_cache.pop(name, None)
             
             if is_export:
                 rich_print(f"📄 Exported {name}.md", style="dim")
@@ -298,29 +353,73 @@ When shell commands are enabled, additional instructions are automatically appen
             rich_print(f"❌ Error writing {name}.md: {e}", style="red")
             return False
 
+    @staticmethod
+    def _read_text(file_path: str, size: int) -> str:
+        """Read a small UTF-8 file with raw os calls, skipping the text I/O layers"""
+        fd = os.open(file_path, os.O_RDONLY | getattr(os, "O_BINARY", 0))
+        try:
+            # One read normally returns the whole file; the next confirms EOF
+            chunks = []
+            while True:
+                chunk = os.read(fd, size + 1)
+                if not chunk:
+                    break
+                chunks.append(chunk)
+        finally:
+            os.close(fd)
+        content = b"".join(chunks).decode('utf-8')
+        if '\r' in content:
+            # Universal newlines, as text mode did: CRLF, then any lone CR
+            content = content.replace('\r\n', '\n').replace('\r', '\n')
+        return content
+
+    def _write_text(self, file_path: str, content: str) -> None:
+        """Write text as UTF-8 bytes in one call, with platform newlines"""
+        if os.linesep != '\n':
+            content = content.replace('\n', os.linesep)
+        data = content.encode('utf-8')
+        try:
+            with open(file_path, 'wb') as f:
+                f.write(data)
+        except FileNotFoundError:
+            # The prompts directory was removed after it was checked: recreate it
+            self._checked_dirs.discard(os.path.abspath(self.prompts_dir))
+            self.prompts_dir.mkdir(parents=True, exist_ok=True)
+            with open(file_path, 'wb') as f:
+                f.write(data)
+
+    @staticmethod
+    def _file_has_content(file_path: str, content: str) -> bool:
+        """Whether a text file already holds exactly this content"""
+        try:
+            with open(file_path, 'r', encoding='utf-8') as f:
+                return f.read() == content
+        except (OSError, UnicodeDecodeError):
+            return False
+
     def _get_prompt_description(self, name: str) -> str:
         """Get description for a prompt"""
-        descriptions = {
-            "default": "Balanced coding assistant for general programming tasks",
-            "senior_dev": "Expert-level mentor focusing on best practices and code quality", 
-            "project_architect": "Large-scale system design and project architecture",
-            "debugging_expert": "Specialized in troubleshooting and problem-solving",
-            "code_reviewer": "Meticulous code quality and security review",
-            "rapid_prototyper": "Fast iteration and proof-of-concept development"
-        }
-        return descriptions.get(name, "Custom system prompt")
+        return _PROMPT_DESCRIPTIONS.get(name, "Custom system prompt")
 
     def load_prompt(self, name: str) -> Tuple[str, bool]:
         """Load prompt from file or built-in. Returns (content, is_from_file)"""
-        file_path = self.prompts_dir / f"{name}.md"
+        file_path = _prompt_path(str(self.prompts_dir), name)
         
-        # Try to load from file first
-        if file_path.exists():
+        # Try to load from file first; one stat tells whether the cached copy is current
+        try:
+            st = os.stat(file_path)
+        except OSError:
+            st = None
+        if st is not None:
+            mtime = st.st_mtime_ns
+            cached = self._content_cache.get(name)
+            if cached is not None and cached[0] == mtime:
+                return cached[1], True
             try:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    content = f.read()
+                content = self._read_text(file_path, st.st_size)
                 # Strip markdown formatting for AI consumption
                 clean_content = self._strip_markdown(content)
+                self._content_cache[name] = (mtime, clean_content)
                 return clean_content, True
             except Exception as e:
                 rich_print(f"❌ Error loading {name}.md: {e}", style="red")
@@ -333,27 +432,67 @@ When shell commands are enabled, additional instructions are automatically appen
 
     def _strip_markdown(self, content: str) -> str:
         """Strip markdown formatting to avoid confusing the AI"""
-        # Remove headers
-        content = re.sub(r'^#+\s*', '', content, flags=re.MULTILINE)
-        
-        # Remove emphasis (bold/italic)
-        content = re.sub(r'\*\*(.*?)\*\*', r'\1', content)
-        content = re.sub(r'\*(.*?)\*', r'\1', content)
-        
-        # Remove horizontal rules
-        content = re.sub(r'^---+\s*$', '', content, flags=re.MULTILINE)
-        
-        # Remove metadata blocks (between first --- and second ---)
-        content = re.sub(r'^---.*?^---\s*$', '', content, flags=re.MULTILINE | re.DOTALL)
-        
+        # Plain-text prompts only need their blank lines tidied
+        if '#' not in content and '*' not in content and '---' not in content:
+            return _RE_BLANKS.sub('\n\n', content).strip()
+
+        lines = content.split('\n')
+
+        # Remove a leading metadata block (between first --- and second ---)
+        if lines and _RE_RULE.fullmatch(lines[0]):
+            for i in range(1, len(lines)):
+                if _RE_RULE.fullmatch(lines[i]):
+                    del lines[:i + 1]
+                    break
+
+        # One pass over the lines instead of a regex pass per construct
+        stripped = []
+        after_bare_header = False
+        for line in lines:
+            indented = False
+            if after_bare_header:
+                # A bare '#' line swallows the whitespace that follows it
+                text = line.lstrip()
+                if not text:
+                    continue
+                after_bare_header = False
+                indented = len(text) != len(line)  # Then it can't start a header
+                line = text
+            if not indented and line.startswith('#'):
+                line = line.lstrip('#').lstrip()  # Headers
+                if not line:
+                    after_bare_header = True
+                    continue
+            if '*' in line:
+                line = _RE_ITALIC.sub(r'\1', _RE_BOLD.sub(r'\1', line))  # Bold, then italic
+            if line.startswith('---') and _RE_RULE.fullmatch(line):
+                line = ''  # Horizontal rules
+            stripped.append(line)
+
         # Clean up extra whitespace
-        content = re.sub(r'\n\s*\n\s*\n', '\n\n', content)
+        content = _RE_BLANKS.sub('\n\n', '\n'.join(stripped))
         content = content.strip()
         
         return content
 
     def list_available_prompts(self) -> Dict[str, Dict]:
         """List all available prompts with metadata"""
+        try:
+            dir_mtime = os.stat(self.prompts_dir).st_mtime_ns
+        except OSError:
+            dir_mtime = None
+        if dir_mtime is not None and dir_mtime == self._prompts_cache_mtime:
+            return self._prompts_cache
+
+        # One directory scan instead of a stat per prompt
+        file_names = []
+        if dir_mtime is not None:
+            with os.scandir(self.prompts_dir) as entries:
+                for entry in entries:
+                    if entry.name.endswith(".md") and entry.name != "README.md" and entry.is_file():
+                        file_names.append(entry.name[:-3])
+        file_set = set(file_names)
+
         prompts = {}
         
         # Add built-in prompts
@@ -361,26 +500,24 @@ When shell commands are enabled, additional instructions are automatically appen
             prompts[name] = {
                 'source': 'built-in',
                 'description': self._get_prompt_description(name),
-                'file_exists': (self.prompts_dir / f"{name}.md").exists()
+                'file_exists': name in file_set
             }
         
         # Add file-based prompts
-        if self.prompts_dir.exists():
-            for file_path in self.prompts_dir.glob("*.md"):
-                if file_path.name == "README.md":
-                    continue
-                    
-                name = file_path.stem
-                if name not in prompts:
-                    prompts[name] = {
-                        'source': 'file',
-                        'description': 'Custom prompt from file',
-                        'file_exists': True
-                    }
-                else:
-                    # Update source to indicate file override
-                    prompts[name]['source'] = 'file (overrides built-in)'
+        for name in file_names:
+            if name in self.builtin_prompts:
+                # Update source to indicate file override
+                prompts[name]['source'] = 'file (overrides built-in)'
+            else:
+                prompts[name] = {
+                    'source': 'file',
+                    'description': 'Custom prompt from file',
+                    'file_exists': True
+                }
         
+        if dir_mtime is not None:
+            self._prompts_cache = prompts
+            self._prompts_cache_mtime = dir_mtime
         return prompts
 
     def get_prompt_preview(self, name: str, max_lines: int = 10) -> str:
@@ -389,16 +526,22 @@ When shell commands are enabled, additional instructions are automatically appen
         if not content:
             return f"❌ Prompt '{name}' not found"
         
-        lines = content.split('\n')
-        preview_lines = lines[:max_lines]
+        # Find where the shown lines end; the rest is counted in place, not copied
+        end = -1
+        for _ in range(max_lines):
+            end = content.find('\n', end + 1)
+            if end == -1:
+                break
         
         source = "file" if is_from_file else "built-in"
-        preview = '\n'.join(preview_lines)
         
-        if len(lines) > max_lines:
-            preview += f"\n... ({len(lines) - max_lines} more lines)"
+        if end == -1 and max_lines > 0:
+            preview = content
+        else:
+            more = content.count('\n', end + 1) + 1
+            preview = f"{content[:max(end, 0)]}\n... ({more} more lines)"
         
-        return f"📋 {name} ({source}):\n{'-' * 40}\n{preview}\n{'-' * 40}"
+        return f"📋 {name} ({source}):\n{_PREVIEW_RULE}\n{preview}\n{_PREVIEW_RULE}"
 
     def create_custom_prompt(self, name: str, content: str) -> bool:
         """Create a new custom prompt file"""
@@ -6,18 +6,18 @@ A beautiful, interactive AI coding assistant with function calling capabilities.
 
 import sys
 import argparse
+from functools import lru_cache
 from pathlib import Path
 
 # Add current directory to Python path for imports
 sys.path.insert(0, str(Path(__file__).parent))
 
-from core.agent import OllamaAgent
 from core.config import AgentConfig
-from utils.terminal import check_ollama_connection
-from utils.display import rich_print
 
 
-def main():
+@lru_cache(maxsize=None)
+def _build_parser() -> argparse.ArgumentParser:
+    """Command line parser, built once and reused by later main() calls"""
     parser = argparse.ArgumentParser(
         description="Ollama AI Agent with function calling"
     )
@@ -72,13 +72,26 @@ def main():
         type=str,
         help="Set initial working directory"
     )
+    parser.add_argument(
+        "--session-log",
+        action="store_true",
+        help="Save each conversation under ~/.ollama-agent/history for /resume"
+    )
     parser.add_argument(
         "--unsafe-mode",
         action="store_true",
         help="Disable directory safety restrictions (USE WITH CAUTION)"
     )
+    return parser
+
+
+def main():
+    args = _build_parser().parse_args()
 
-    args = parser.parse_args()
+    # Imported after parsing so --help and bad arguments skip requests and rich
+    from core.agent import OllamaAgent
+    from utils.terminal import check_ollama_connection
+    from utils.display import rich_print
 
     # Create configuration
     config = AgentConfig(
@@ -92,6 +105,7 @@ def main():
         current_prompt=args.prompt_type,
         temperature=args.temperature,
         safe_mode=not args.unsafe_mode,
+        session_log_enabled=args.session_log,
     )
 
     # Handle initial working directory change
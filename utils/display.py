@@ -3,47 +3,77 @@ Display utilities and formatting functions
 """
 
 import time
+from functools import lru_cache
 from typing import List, Tuple, Optional, Dict
 from utils.terminal import is_terminal_compatible, get_terminal_width
 
 # Rich imports with fallback
 try:
-    from rich.console import Console
+    from rich.console import Console, Group
     from rich.syntax import Syntax
     from rich.panel import Panel
     from rich.text import Text
     from rich.table import Table
+    from rich.cells import cell_len
 
     RICH_AVAILABLE = True
 except ImportError:
     RICH_AVAILABLE = False
+    cell_len = len
 
 # Initialize console
 RICH_ENABLED = RICH_AVAILABLE and is_terminal_compatible()
 console = Console(width=get_terminal_width()) if RICH_ENABLED else None
 
+# Set after a Rich render fails; later calls go straight to plain output
+_rich_broken = False
+
+
+def _disable_rich_output() -> None:
+    """Stop retrying Rich rendering once it has failed in this terminal"""
+    global _rich_broken
+    _rich_broken = True
+
+
+# Row count above which listings skip the Rich table layout and print plainly
+LARGE_TABLE_THRESHOLD = 500
+
 
 def rich_print(
     text: str,
     style: Optional[str] = None,
     panel: bool = False,
     title: Optional[str] = None,
+    end: str = "\n",
 ) -> None:
     """Print with rich formatting if available, fallback to regular print"""
-    if RICH_ENABLED and console:
+    if RICH_ENABLED and console and not _rich_broken:
         if panel:
-            console.print(Panel(text, title=title, style=style))
+            console.print(Panel(text, title=title, style=style), end=end)
         else:
-            console.print(text, style=style)
+            console.print(text, style=style, end=end)
     else:
-        print(text)
+        print(text, end=end, flush=True)
+
+
+def print_styled_lines(lines: List[Tuple[str, Optional[str]]]) -> None:
+    """Print (text, style) lines with a single console write"""
+    if RICH_ENABLED and console and not _rich_broken:
+        output = Text()
+        for i, (line, style) in enumerate(lines):
+            if i:
+                output.append("\n")
+            output.append(line, style=style)
+        console.print(output)
+    else:
+        print("\n".join(line for line, _ in lines), flush=True)
 
 
 def print_syntax_highlighted(
-    code: str, language: str = "python", enabled: bool = True
+    code: str, language: str = "python", enabled: bool = True, header: Optional[str] = None
 ) -> None:
-    """Print code with syntax highlighting"""
-    if enabled and RICH_ENABLED and console:
+    """Print code with syntax highlighting, optionally under a header line"""
+    if enabled and RICH_ENABLED and console and not _rich_broken:
         try:
             # Limit width to prevent terminal corruption
             width = min(get_terminal_width() - 4, 120)
@@ -55,68 +85,118 @@ def print_syntax_highlighted(
                 word_wrap=True,
                 code_width=width,
             )
-            console.print(syntax)
+            # Header and code go out in one console write
+            if header is not None:
+                console.print(Group(Text(header, style="bold cyan"), syntax))
+            else:
+                console.print(syntax)
+            return
         except Exception:
-            # Fallback if syntax highlighting fails
-            print_code_plain(code, language)
-    else:
-        print_code_plain(code, language)
+            _disable_rich_output()  # Fall back to plain output below
+
+    if header is not None:
+        rich_print(header, style="bold cyan")
+    print_code_plain(code, language)
 
 
 def print_code_plain(code: str, language: str) -> None:
     """Print code without syntax highlighting but with line numbers"""
-    print(f"Content ({language}):")
-    print("-" * 40)
-    lines = code.split("\n")
-    for i, line in enumerate(lines, 1):
-        print(f"{i:3d} | {line}")
-    print("-" * 40)
+    rule = "-" * 40
+    body = "\n".join(f"{i:3d} | {line}" for i, line in enumerate(code.split("\n"), 1))
+    print(f"Content ({language}):\n{rule}\n{body}\n{rule}")
+
+
+# Column layouts for the listing tables: (header, add_column keyword arguments)
+_FILE_COLUMNS = (
+    ("Name", {"style": "cyan", "no_wrap": False, "max_width": 40}),
+    ("Type", {"style": "magenta", "width": 10}),
+    ("Size", {"justify": "right", "style": "green", "width": 12}),
+)
+_PROMPT_COLUMNS = (
+    ("Name", {"style": "cyan", "width": 18}),
+    ("Description", {"style": "white", "no_wrap": False}),
+    ("Status", {"style": "green", "width": 12}),
+)
+_PARAM_COLUMNS = (
+    ("Parameter", {"style": "bold blue", "width": 20}),
+    ("Value & Description", {"style": "white", "no_wrap": False}),
+)
+_STATUS_COLUMNS = (
+    ("Property", {"style": "bold blue", "width": 22}),
+    ("Value", {"style": "green"}),
+)
+_MODEL_COLUMNS = (
+    ("Model", {"style": "cyan", "no_wrap": False}),
+    ("Status", {"style": "green", "width": 15}),
+)
+
+
+def _new_table(title: str, columns: Tuple[Tuple[str, dict], ...], **kwargs) -> "Table":
+    """Empty table sized to the terminal with the given column layout"""
+    table = Table(title=title, width=get_terminal_width() - 4, **kwargs)
+    for header, options in columns:
+        table.add_column(header, **options)
+    return table
 
 
 def print_file_table(
     files_data: List[Tuple[str, str, str]], enabled: bool = True
 ) -> None:
     """Print file listing as a table"""
-    if enabled and RICH_ENABLED and console:
+    if (
+        enabled
+        and RICH_ENABLED
+        and console
+        and not _rich_broken
+        and len(files_data) <= LARGE_TABLE_THRESHOLD
+    ):
         try:
-            table = Table(title="📁 Directory Contents", width=get_terminal_width() - 4)
-            table.add_column("Name", style="cyan", no_wrap=False, max_width=40)
-            table.add_column("Type", style="magenta", width=10)
-            table.add_column("Size", justify="right", style="green", width=12)
+            table = _new_table("📁 Directory Contents", _FILE_COLUMNS)
 
             for name, file_type, size in files_data:
                 icon = "📁" if file_type == "directory" else "📄"
                 # Truncate long filenames
                 display_name = name if len(name) <= 35 else name[:32] + "..."
-                table.add_row(f"{icon} {display_name}", file_type, size)
+                # Text cells skip markup parsing, so "[" in a filename prints as-is
+                table.add_row(Text(f"{icon} {display_name}"), Text(file_type), Text(size))
 
             console.print(table)
         except Exception:
+            _disable_rich_output()
             print_file_list_plain(files_data)
     else:
         print_file_list_plain(files_data)
 
 
+def _ljust_cells(text: str, width: int) -> str:
+    """Left-justify text to a width in terminal cells, not code points"""
+    if text.isascii():
+        return text.ljust(width)
+    # Wide characters (CJK, emoji) take two cells each
+    return text + " " * (width - cell_len(text))
+
+
 def print_file_list_plain(files_data: List[Tuple[str, str, str]]) -> None:
     """Print file listing without rich formatting"""
     print("📁 Directory Contents:")
     print("-" * 60)
     for name, file_type, size in files_data:
         icon = "📁" if file_type == "directory" else "📄"
-        print(f"{icon} {name:<30} {file_type:<10} {size:>10}")
+        print(f"{icon} {_ljust_cells(name, 30)} {file_type:<10} {size:>10}")
     print("-" * 60)
 
 
 def print_prompts_table(prompts: Dict[str, str], current_prompt: str, enabled: bool = True) -> None:
     """Print available system prompts as a table"""
-    if enabled and RICH_ENABLED and console:
+    if (
+        enabled
+        and RICH_ENABLED
+        and console
+        and not _rich_broken
+        and len(prompts) <= LARGE_TABLE_THRESHOLD
+    ):
         try:
-            table = Table(
-                title="📋 Available System Prompts", width=get_terminal_width() - 4
-            )
-            table.add_column("Name", style="cyan", width=18)
-            table.add_column("Description", style="white", no_wrap=False)
-            table.add_column("Status", style="green", width=12)
+            table = _new_table("📋 Available System Prompts", _PROMPT_COLUMNS)
 
             for name, description in prompts.items():
                 status = "← current" if name == current_prompt else "available"
@@ -125,6 +205,7 @@ def print_prompts_table(prompts: Dict[str, str], current_prompt: str, enabled: b
 
             console.print(table)
         except Exception:
+            _disable_rich_output()
             print_prompts_plain(prompts, current_prompt)
     else:
         print_prompts_plain(prompts, current_prompt)
@@ -137,25 +218,22 @@ def print_prompts_plain(prompts: Dict[str, str], current_prompt: str) -> None:
     for name, description in prompts.items():
         indicator = " ← current" if name == current_prompt else ""
         icon = "🎯" if name == current_prompt else "📋"
-        print(f"{icon} {name:<18} {description}{indicator}")
+        print(f"{icon} {_ljust_cells(name, 18)} {description}{indicator}")
     print("-" * 80)
 
 
 def print_model_params_table(params_data: Dict[str, str], enabled: bool = True) -> None:
     """Print model parameters as a table"""
-    if enabled and RICH_ENABLED and console:
+    if enabled and RICH_ENABLED and console and not _rich_broken:
         try:
-            table = Table(
-                title="🎛️ Model Parameters", width=get_terminal_width() - 4
-            )
-            table.add_column("Parameter", style="bold blue", width=20)
-            table.add_column("Value & Description", style="white", no_wrap=False)
+            table = _new_table("🎛️ Model Parameters", _PARAM_COLUMNS)
 
             for param, value_desc in params_data.items():
                 table.add_row(param, value_desc)
 
             console.print(table)
         except Exception:
+            _disable_rich_output()
             print_model_params_plain(params_data)
     else:
         print_model_params_plain(params_data)
@@ -170,29 +248,78 @@ def print_model_params_plain(params_data: Dict[str, str]) -> None:
     print("-" * 80)
 
 
+# About one frame at 60 Hz; shorter typewriter runs print without animation
+_MIN_ANIMATION_SECONDS = 0.016
+
+
 def typewriter_print(
-    text: str, speed: float = 0.03, enabled: bool = True, style: Optional[str] = None
+    text: str,
+    speed: float = 0.03,
+    enabled: bool = True,
+    style: Optional[str] = None,
+    end: str = "\n",
 ) -> None:
     """Print text with typewriter effect"""
     if not enabled or speed <= 0:
-        rich_print(text, style=style)
+        rich_print(text, style=style, end=end)
         return
 
-    for char in text:
-        if RICH_ENABLED and console and style:
-            console.print(char, end="", style=style)
+    # Animation shorter than one frame can't be seen; print it in one go
+    if speed * len(text) < _MIN_ANIMATION_SECONDS:
+        if RICH_ENABLED and console and not _rich_broken:
+            console.print(Text(text, style=style or ""), end=end, soft_wrap=True)
         else:
-            print(char, end="", flush=True)
+            print(text, end=end, flush=True)
+        return
 
-        if char != "\n":
-            time.sleep(speed)
+    if RICH_ENABLED and console and not _rich_broken and style and not console.legacy_windows:
+        # Resolve the style to escape codes once and write characters raw,
+        # instead of a full console.print (markup + render) per character
+        style_on, style_off = _style_codes(style)
+        out = console.file
+        out.write(style_on)
+        # Sleep to a running deadline so write and wake-up overhead don't add up
+        deadline = time.perf_counter()
+        for char in text:
+            if char == "\n":
+                out.write(f"{style_off}\n{style_on}")
+                out.flush()
+                continue
+            out.write(char)
+            out.flush()
+            deadline += speed
+            remaining = deadline - time.perf_counter()
+            if remaining > 0:
+                time.sleep(remaining)
+        out.write(style_off)
+    else:
+        deadline = time.perf_counter()
+        for char in text:
+            if RICH_ENABLED and console and not _rich_broken and style:
+                console.print(char, end="", style=style)
+            else:
+                print(char, end="", flush=True)
 
-    print()  # Final newline
+            if char != "\n":
+                deadline += speed
+                remaining = deadline - time.perf_counter()
+                if remaining > 0:
+                    time.sleep(remaining)
 
+    print(end=end, flush=True)  # Final newline (or nothing when streaming)
 
-def format_help_text(rich_enabled: bool = True) -> None:
-    """Display help text"""
-    help_content = """
+
+@lru_cache(maxsize=32)
+def _style_codes(style: str) -> Tuple[str, str]:
+    """Escape sequences that switch a style on and off on this console"""
+    with console.capture() as capture:
+        console.print(Text("X", style=style), end="")
+    style_on, _, style_off = capture.get().partition("X")
+    return style_on, style_off
+
+
+# Slash command reference shown by /help
+_HELP_TEXT = """
 📚 Available slash commands:
 
 Basic Commands:
@@ -200,6 +327,9 @@ Basic Commands:
   /help               - Show this help message
   /status             - Show current session status
   /clear              - Clear conversation history
+  /resume [session]   - List saved sessions or restore one
+  /history <turns>    - Set how many recent turns are kept (0=unlimited)
+  /cache <on|off|clear> - Replay stored replies for repeated prompts (off by default)
   /verbose            - Toggle verbose mode on/off
 
 Model & Connection:
@@ -244,26 +374,36 @@ Directory Safety:
 💡 Regular prompts (not starting with /) will be sent to the AI model.
 💡 System prompts define the AI's personality and capabilities.
 💡 Model parameters control response style and creativity.
-    """
+"""
+
+
+@lru_cache(maxsize=4)
+def _help_panel(width: int) -> "Panel":
+    """Help panel for a given terminal width, built once per width"""
+    # Plain Text so "[session]" and "[path]" aren't taken as markup tags
+    return Panel(
+        Text(_HELP_TEXT.strip()),
+        title="🤖 AI Agent Help",
+        style="bold blue",
+        width=width - 4,
+    )
+
 
-    if rich_enabled and RICH_ENABLED and console:
+def format_help_text(rich_enabled: bool = True) -> None:
+    """Display help text"""
+    if rich_enabled and RICH_ENABLED and console and not _rich_broken:
         try:
-            help_panel = Panel(
-                help_content.strip(),
-                title="🤖 AI Agent Help",
-                style="bold blue",
-                width=get_terminal_width() - 4,
-            )
-            console.print(help_panel)
+            console.print(_help_panel(get_terminal_width()))
         except Exception:
-            print(help_content)
+            _disable_rich_output()
+            print(_HELP_TEXT)
     else:
-        print(help_content)
+        print(_HELP_TEXT)
 
 
 def print_startup_banner(model: str, config: dict, rich_enabled: bool = True) -> None:
     """Print startup banner"""
-    if rich_enabled and RICH_ENABLED and console:
+    if rich_enabled and RICH_ENABLED and console and not _rich_broken:
         try:
             title = Text("🤖 Interactive AI Agent", style="bold cyan")
             info_table = Table.grid(padding=1)
@@ -282,6 +422,7 @@ def print_startup_banner(model: str, config: dict, rich_enabled: bool = True) ->
             console.print(startup_panel)
             console.print("─" * min(50, get_terminal_width()), style="dim")
         except Exception:
+            _disable_rich_output()
             print_startup_plain(model, config)
     else:
         print_startup_plain(model, config)
@@ -297,21 +438,16 @@ def print_startup_plain(model: str, config: dict) -> None:
 
 def print_status_table(status_data: dict, rich_enabled: bool = True) -> None:
     """Print status information as a table"""
-    if rich_enabled and RICH_ENABLED and console:
+    if rich_enabled and RICH_ENABLED and console and not _rich_broken:
         try:
-            table = Table(
-                title="📊 Session Status",
-                show_header=False,
-                width=get_terminal_width() - 4,
-            )
-            table.add_column("Property", style="bold blue", width=22)
-            table.add_column("Value", style="green")
+            table = _new_table("📊 Session Status", _STATUS_COLUMNS, show_header=False)
 
             for key, value in status_data.items():
                 table.add_row(key, str(value))
 
             console.print(table)
         except Exception:
+            _disable_rich_output()
             print_status_plain(status_data)
     else:
         print_status_plain(status_data)
@@ -328,13 +464,15 @@ def print_models_table(
     models: List[str], current_model: str, rich_enabled: bool = True
 ) -> None:
     """Print available models as a table"""
-    if rich_enabled and RICH_ENABLED and console:
+    if (
+        rich_enabled
+        and RICH_ENABLED
+        and console
+        and not _rich_broken
+        and len(models) <= LARGE_TABLE_THRESHOLD
+    ):
         try:
-            table = Table(
-                title="📦 Available Ollama Models", width=get_terminal_width() - 4
-            )
-            table.add_column("Model", style="cyan", no_wrap=False)
-            table.add_column("Status", style="green", width=15)
+            table = _new_table("📦 Available Ollama Models", _MODEL_COLUMNS)
 
             for model in models:
                 if model == current_model:
@@ -344,6 +482,7 @@ def print_models_table(
 
             console.print(table)
         except Exception:
+            _disable_rich_output()
             print_models_plain(models, current_model)
     else:
         print_models_plain(models, current_model)
@@ -5,10 +5,16 @@ Safe filesystem operations and directory management
 import os
 import stat
 import platform
+import time
+from functools import lru_cache
 from pathlib import Path
-from typing import List, Tuple, Optional
+from typing import Dict, List, Set, Tuple, Optional
 from utils.display import rich_print
 
+# Platform name, looked up once; the directory lists below are keyed by it
+_SYSTEM = platform.system().lower()
+_IS_WINDOWS = _SYSTEM == "windows"
+
 
 class DirectoryValidator:
     """Validates directory operations for safety"""
@@ -49,37 +55,19 @@ class DirectoryValidator:
     @staticmethod
     def get_system_type() -> str:
         """Get normalized system type"""
-        system = platform.system().lower()
-        return 'windows' if system == 'windows' else system
+        return 'windows' if _IS_WINDOWS else _SYSTEM
 
     @staticmethod
     def is_system_directory(path: str) -> bool:
         """Check if path is a system directory"""
         abs_path = os.path.abspath(path)
-        system_type = DirectoryValidator.get_system_type()
-        
-        system_dirs = DirectoryValidator.SYSTEM_DIRS.get(system_type, [])
-        
-        for sys_dir in system_dirs:
-            # Check if path is exactly a system directory or within one
-            if abs_path == sys_dir or abs_path.startswith(sys_dir + os.sep):
-                return True
-        
-        return False
+        # Exactly a system directory or within one
+        return abs_path in _SYSTEM_DIRS or abs_path.startswith(_SYSTEM_DIR_PREFIXES)
 
     @staticmethod
     def is_sensitive_directory(path: str) -> bool:
         """Check if path is a sensitive directory requiring confirmation"""
-        abs_path = os.path.abspath(path)
-        system_type = DirectoryValidator.get_system_type()
-        
-        sensitive_dirs = DirectoryValidator.SENSITIVE_DIRS.get(system_type, [])
-        
-        for sens_dir in sensitive_dirs:
-            if abs_path == sens_dir:
-                return True
-        
-        return False
+        return os.path.abspath(path) in _SENSITIVE_DIRS
 
     @staticmethod
     def check_directory_permissions(path: str) -> Tuple[bool, str]:
@@ -87,19 +75,18 @@ class DirectoryValidator:
         try:
             abs_path = os.path.abspath(path)
             
-            if not os.path.exists(abs_path):
+            try:
+                st = os.stat(abs_path)
+            except OSError:
                 return False, f"Directory does not exist: {abs_path}"
             
-            if not os.path.isdir(abs_path):
+            if not stat.S_ISDIR(st.st_mode):
                 return False, f"Path is not a directory: {abs_path}"
             
-            # Check read permissions
-            if not os.access(abs_path, os.R_OK):
-                return False, f"No read permission for: {abs_path}"
-            
-            # Check if we can list directory contents
+            # Open it for listing: unlike os.access this sees ACLs, the
+            # effective uid and network filesystem denials
             try:
-                os.listdir(abs_path)
+                os.scandir(abs_path).close()
             except PermissionError:
                 return False, f"Cannot list directory contents: {abs_path}"
             
@@ -112,14 +99,29 @@ class DirectoryValidator:
     def is_within_allowed_paths(path: str, allowed_paths: List[str]) -> bool:
         """Check if path is within allowed base directories"""
         abs_path = os.path.abspath(path)
-        
-        for allowed in allowed_paths:
-            allowed_abs = os.path.abspath(allowed)
-            # Check if path is within or exactly matches allowed directory
-            if abs_path == allowed_abs or abs_path.startswith(allowed_abs + os.sep):
-                return True
-        
-        return False
+        allowed, prefixes = _allowed_prefixes(tuple(allowed_paths), os.getcwd())
+        # Check if path is within or exactly matches allowed directory
+        return abs_path in allowed or abs_path.startswith(prefixes)
+
+
+# Directory lists for the running platform, resolved once at import
+_SYSTEM_DIRS = frozenset(
+    DirectoryValidator.SYSTEM_DIRS.get(DirectoryValidator.get_system_type(), ())
+)
+_SENSITIVE_DIRS = frozenset(
+    DirectoryValidator.SENSITIVE_DIRS.get(DirectoryValidator.get_system_type(), ())
+)
+
+# Trailing-separator forms of _SYSTEM_DIRS for a single startswith() check
+_SYSTEM_DIR_PREFIXES = tuple(d + os.sep for d in _SYSTEM_DIRS)
+
+
+@lru_cache(maxsize=8)
+def _allowed_prefixes(allowed_paths: Tuple[str, ...], cwd: str) -> Tuple[frozenset, Tuple[str, ...]]:
+    """Normalized allowed directories and their trailing-separator prefixes"""
+    # cwd is part of the cache key because relative entries resolve against it
+    allowed = frozenset(os.path.normpath(os.path.join(cwd, p)) for p in allowed_paths)
+    return allowed, tuple(p + os.sep for p in allowed)
 
 
 def safe_change_directory(target_path: str, safe_mode: bool = True, 
@@ -211,13 +213,55 @@ def get_directory_info(path: str = ".") -> dict:
         return {"error": str(e)}
 
 
+def existing_directories(paths: List[str]) -> Set[str]:
+    """Return the paths that are existing directories, scanning each parent once"""
+    by_parent: Dict[str, Dict[str, str]] = {}
+    for path in paths:
+        parent, name = os.path.split(os.path.normpath(path))
+        by_parent.setdefault(parent, {})[name] = path
+
+    found = set()
+    for parent, names in by_parent.items():
+        # A stat per name beats listing a big parent (all of / just for /tmp)
+        if len(names) == 1:
+            found.update(path for path in names.values() if os.path.isdir(path))
+            continue
+        try:
+            with os.scandir(parent) as entries:
+                for entry in entries:
+                    path = names.get(entry.name)
+                    if path is not None and entry.is_dir():
+                        found.add(path)
+        except PermissionError:
+            # Search-only parents (e.g. /home at 0711) allow stat but not listing
+            found.update(path for path in names.values() if os.path.isdir(path))
+        except OSError:
+            continue
+    return found
+
+
+# Seconds a list of suggested directories is reused by /safedirs
+_SAFE_DIRS_TTL = 60.0
+
+# (timestamp, home directory, suggestions) from the last scan
+_safe_dirs_cache: Optional[Tuple[float, str, List[str]]] = None
+
+
 def suggest_safe_directories() -> List[str]:
     """Suggest safe directories for development work"""
-    suggestions = []
+    global _safe_dirs_cache
     
     # User home directory
     home = os.path.expanduser("~")
-    suggestions.append(home)
+    cached = _safe_dirs_cache
+    if (
+        cached is not None
+        and cached[1] == home
+        and time.monotonic() - cached[0] < _SAFE_DIRS_TTL
+    ):
+        return list(cached[2])
+    
+    suggestions = [home]
     
     # Common development directories
     dev_dirs = [
@@ -229,20 +273,20 @@ def suggest_safe_directories() -> List[str]:
         os.path.join(home, "Desktop"),
     ]
     
-    for dev_dir in dev_dirs:
-        if os.path.exists(dev_dir) and os.access(dev_dir, os.R_OK):
-            suggestions.append(dev_dir)
-    
     # Temporary directories
     temp_dirs = ["/tmp", "/var/tmp"]
-    if platform.system().lower() == "windows":
+    if _IS_WINDOWS:
         temp_dirs = [os.environ.get("TEMP", "C:\\temp")]
     
-    for temp_dir in temp_dirs:
-        if temp_dir and os.path.exists(temp_dir) and os.access(temp_dir, os.R_OK):
-            suggestions.append(temp_dir)
+    candidates = dev_dirs + [d for d in temp_dirs if d]
+    existing = existing_directories(candidates)
+    for candidate in candidates:
+        if candidate in existing and os.access(candidate, os.R_OK):
+            suggestions.append(candidate)
     
-    return list(set(suggestions))  # Remove duplicates
+    suggestions = list(set(suggestions))  # Remove duplicates
+    _safe_dirs_cache = (time.monotonic(), home, suggestions)
+    return list(suggestions)
 
 
 def format_directory_safety_info(path: str = ".") -> str:
@@ -3,9 +3,9 @@ Terminal detection and utilities
 """
 
 import os
+import signal
 import sys
-import requests
-import readline
+from functools import lru_cache
 from typing import Optional
 
 
@@ -29,7 +29,13 @@ def is_terminal_compatible() -> bool:
 
 def setup_readline_history() -> Optional[str]:
     """Setup readline for command history and arrow key navigation"""
+    # Piped or scripted input never reaches the line editor
+    if not sys.stdin.isatty():
+        return None
+
     try:
+        import readline
+
         # Enable tab completion
         readline.parse_and_bind("tab: complete")
 
@@ -53,15 +59,31 @@ def save_readline_history(history_file: Optional[str]) -> None:
     """Save command history to file"""
     if history_file:
         try:
+            import readline
+
             readline.write_history_file(history_file)
         except:
             pass  # Ignore errors when saving history
 
 
+@lru_cache(maxsize=1)
+def _probe_session() -> "requests.Session":
+    """Shared keep-alive session for Ollama connection probes"""
+    import requests
+
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=2)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
 def check_ollama_connection(api_base: str = "http://localhost:11434") -> bool:
     """Check if Ollama is running and accessible"""
+    import requests  # Deferred: only needed when probing the server
+
     try:
-        response = requests.get(f"{api_base}/api/tags", timeout=5)
+        response = _probe_session().get(f"{api_base}/api/tags", timeout=5)
         return response.status_code == 200
     except requests.exceptions.RequestException:
         return False
@@ -69,8 +91,10 @@ def check_ollama_connection(api_base: str = "http://localhost:11434") -> bool:
 
 def test_ollama_connection(api_base: str) -> bool:
     """Test connection to Ollama instance with more detailed feedback"""
+    import requests
+
     try:
-        response = requests.get(f"{api_base}/api/tags", timeout=10)
+        response = _probe_session().get(f"{api_base}/api/tags", timeout=10)
         if response.status_code == 200:
             return True
         else:
@@ -83,9 +107,41 @@ def test_ollama_connection(api_base: str) -> bool:
         return False
 
 
+# Last terminal width seen; only cached where SIGWINCH can invalidate it
+_cached_width: Optional[int] = None
+_width_cacheable = False
+
+# SIGWINCH handler that was installed before ours, chained from it
+_previous_winch_handler = None
+
+
+def _invalidate_terminal_width(signum=None, frame=None) -> None:
+    """Forget the cached width after the terminal is resized"""
+    global _cached_width
+    _cached_width = None
+    # SIG_DFL/SIG_IGN (and None for C-installed handlers) aren't callable
+    if callable(_previous_winch_handler):
+        _previous_winch_handler(signum, frame)
+
+
+if hasattr(signal, "SIGWINCH"):
+    try:
+        _previous_winch_handler = signal.getsignal(signal.SIGWINCH)
+        signal.signal(signal.SIGWINCH, _invalidate_terminal_width)
+        _width_cacheable = True
+    except ValueError:
+        pass  # Handlers can only be installed from the main thread
+
+
 def get_terminal_width() -> int:
     """Get terminal width, with fallback"""
+    global _cached_width
+    if _cached_width is not None:
+        return _cached_width
     try:
-        return os.get_terminal_size().columns
+        width = os.get_terminal_size().columns
     except OSError:
-        return 80  # fallback width
\ No newline at end of file
+        width = 80  # fallback width
+    if _width_cacheable:
+        _cached_width = width
+    return width